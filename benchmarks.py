@@ -0,0 +1,495 @@
+import argparse
+import atexit
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+import numpy as np
+import pandas as pd
+import measures as ms
+import calculators as calc
+import errors as err
+import tables as tab
+import df_transformers as trans
+import outlier_cleaners as oucl
+import regression_models as model
+import kernels
+from merge import merge_catalogues
+from star_table import StarTable
+from conversion import MeasureConverter
+from star_calculators import StarCalculator
+from catalogue import COLS, MEASURE_COLS, CatalogueLoader, err_min_col, err_max_col
+from typing import Callable
+
+SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+
+IMPORT_MODULES = [
+    "measures",
+    "calculators",
+    "tables",
+    "df_transformers",
+    "outlier_cleaners",
+    "clustering",
+    "regression_models",
+    "exoplanetmodel",
+]
+
+SP_TYPES = ["G2 V", "K1", "M4.5", "F8", "A0", "B9", "G", "K5 V", "M", "F5.5", None]
+
+PLANET_MISSING = {
+    "mass": 0.05,
+    "radius": 0.05,
+    "orbital_period": 0.05,
+    "semi_major_axis": 0.4,
+    "eccentricity": 0.5,
+    "temp_calculated": 0.8,
+}
+
+STAR_MISSING = {
+    "star_distance": 0.2,
+    "star_metallicity": 0.3,
+    "star_mass": 0.1,
+    "star_radius": 0.15,
+    "star_teff": 0.2,
+}
+
+ERR_MISSING = 0.3
+
+def gen_catalogue(rows: int, seed=0) -> pd.DataFrame:
+    def with_errors(vals: np.ndarray, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+        errs = []
+        for _ in range(2):
+            e = np.round(np.abs(vals) * rng.uniform(0.01, 0.2, len(vals)), 4)
+            e[rng.random(len(vals)) < ERR_MISSING] = np.nan
+            errs.append(e)
+
+        return errs[0], errs[1]
+
+    rng = np.random.default_rng(seed)
+
+    n_stars = max(1, rows * 2 // 3)
+    star_idx = rng.integers(0, n_stars, rows)
+
+    star_vals = {
+        "star_distance": 10 ** rng.normal(2, 0.5, n_stars),
+        "star_metallicity": rng.normal(0, 0.2, n_stars),
+        "star_mass": 10 ** rng.normal(0, 0.2, n_stars),
+        "star_radius": 10 ** rng.normal(0, 0.2, n_stars),
+        "star_teff": np.clip(rng.normal(5500, 1000, n_stars), 2600, 20000),
+    }
+    for col, p in STAR_MISSING.items():
+        star_vals[col][rng.random(n_stars) < p] = np.nan
+
+    period = 10 ** rng.normal(1, 0.8, rows)
+    sm_axis = np.cbrt(star_vals["star_mass"][star_idx] * (period / 365.25) ** 2)
+    planet_vals = {
+        "mass": 10 ** rng.normal(-0.5, 1.0, rows),
+        "radius": 10 ** rng.normal(-0.5, 0.4, rows),
+        "orbital_period": period,
+        "semi_major_axis": sm_axis,
+        "eccentricity": np.clip(np.abs(rng.normal(0, 0.15, rows)), 0, 0.95),
+        "temp_calculated": rng.uniform(100, 3000, rows),
+    }
+    for col, p in PLANET_MISSING.items():
+        planet_vals[col][rng.random(rows) < p] = np.nan
+
+    data = {
+        "name": ["planet-{0}".format(i) for i in range(rows)],
+        "star_name": ["star-{0}".format(i) for i in star_idx],
+        "star_sp_type": np.array(SP_TYPES, dtype=object)[rng.integers(0, len(SP_TYPES), n_stars)][star_idx],
+        "temp_measured": np.full(rows, np.nan),
+        "mag_v": np.round(rng.normal(11, 2, n_stars)[star_idx], 2),
+    }
+    for col in MEASURE_COLS:
+        if col in planet_vals:
+            vals = np.round(planet_vals[col], 4)
+            err_mins, err_maxs = with_errors(vals, rng)
+
+        else:
+            vals = np.round(star_vals[col], 4)
+            err_mins, err_maxs = with_errors(vals, rng)
+
+            vals, err_mins, err_maxs = vals[star_idx], err_mins[star_idx], err_maxs[star_idx]
+
+        data[col] = vals
+        data[err_min_col(col)], data[err_max_col(col)] = err_mins, err_maxs
+
+    df = pd.DataFrame(data)[COLS]
+
+    return df
+
+def _mass_radius(df: pd.DataFrame) -> pd.DataFrame:
+    return df.dropna(subset=["mass", "radius"])
+
+def _radius_teff(df: pd.DataFrame) -> pd.DataFrame:
+    return df.dropna(subset=["radius", "temp_calculated"])
+
+def case_catalogue_load(df: pd.DataFrame) -> Callable[[], object]:
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    atexit.register(os.remove, path)
+    df.to_csv(path, index=False)
+
+    loader = CatalogueLoader(float32_errors=True)
+
+    return lambda: loader.load(path)
+
+def case_converter_read(df: pd.DataFrame) -> Callable[[], object]:
+    con = MeasureConverter()
+
+    return lambda: list(con.read("mass", ms.Mass, df))
+
+def case_converter_write(df: pd.DataFrame) -> Callable[[], object]:
+    con = MeasureConverter()
+    measures = list(con.read("mass", ms.Mass, df))
+
+    return lambda: con.write("mass", measures, df)
+
+def case_error_gen(df: pd.DataFrame) -> Callable[[], object]:
+    con = MeasureConverter()
+    tr = trans.DFErrorGen(con, err.ErrorGeneratorByOrder(), "orbital_period", ms.OrbitalPeriod)
+
+    return lambda: tr.gen(df)
+
+def case_star_table(df: pd.DataFrame) -> Callable[[], object]:
+    def split_and_gen():
+        return StarTable.split(df).transform_stars([tr.gen]).wide()
+
+    tr = trans.DFErrorGen(MeasureConverter(), err.ErrorGeneratorByOrder(), "star_mass", ms.StarMass)
+
+    return split_and_gen
+
+def case_star_teff_by_sp_class(df: pd.DataFrame) -> Callable[[], object]:
+    con = MeasureConverter()
+    table = tab.SpClassTeffTable(tab.SP_CLASS_TABLE)
+    tr = trans.DFStarTeffBySpClassCalc(con, table)
+
+    return lambda: tr.set_vals(df)
+
+def case_semi_major_axis(df: pd.DataFrame) -> Callable[[], object]:
+    con = MeasureConverter()
+    tr = trans.DFSemiMajorAxisCalc(con, calc.SemiMajorAxisCalc(), err.Round())
+
+    return lambda: tr.calc(df)
+
+def case_planet_teff_mean(df: pd.DataFrame) -> Callable[[], object]:
+    con = MeasureConverter()
+    tr = trans.DFPlanetTeffMeanCalc(con, calc.PlanetTeffCalc(), err.Round())
+
+    return lambda: tr.calc(df)
+
+def case_planet_teff_range(df: pd.DataFrame) -> Callable[[], object]:
+    tr = trans.DFPlanetTeffRangeCalc(MeasureConverter(), calc.PlanetTeffRangeCalc(), err.Round())
+
+    return lambda: tr.calc(df)
+
+def case_star_mass(df: pd.DataFrame) -> Callable[[], object]:
+    con = MeasureConverter()
+    tr = trans.DFStarMassCalculator(con, calc.StarMassCalc(), err.Round(), StarCalculator)
+
+    return lambda: tr.calc(df)
+
+def case_star_calculator(df: pd.DataFrame) -> Callable[[], object]:
+    def calc_stars():
+        for p_ms in groups:
+            star_calc.calc(p_ms)
+
+    con = MeasureConverter()
+    star_calc = StarCalculator(err.Round(), ms.StarMass)
+
+    star_mass = df.dropna(subset=["star_mass", "star_mass_error_min", "star_mass_error_max"])
+    groups = [list(con.read("star_mass", ms.StarMass, s_df)) for _, s_df in star_mass.groupby("star_name")]
+
+    return calc_stars
+
+def case_measure_alloc(df: pd.DataFrame) -> Callable[[], object]:
+    def alloc():
+        return [ms.StarMass(val, e_min, e_max) for val, e_min, e_max in zip(vals, err_mins, err_maxs)]
+
+    vals = df["star_mass"].to_list()
+    err_mins = df["star_mass_error_min"].to_list()
+    err_maxs = df["star_mass_error_max"].to_list()
+
+    return alloc
+
+def case_round(df: pd.DataFrame) -> Callable[[], object]:
+    def round_all():
+        for val, e in zip(vals, errs):
+            e_r = rou.round_err(e)
+            rou.round_val(val, e_r)
+
+    rou = err.Round()
+    mass = df.dropna(subset=["mass", "mass_error_min"])
+    vals = mass["mass"].to_list()
+    errs = mass["mass_error_min"].to_list()
+
+    return round_all
+
+def case_kernel_planet_teff(df: pd.DataFrame) -> Callable[[], object]:
+    con = MeasureConverter()
+    cal = calc.PlanetTeffCalc()
+
+    args = {"star_teff": ms.StarTeff, "star_radius": ms.StarRadius, "semi_major_axis": ms.SemiMajorAxis}
+    rows = df[list(args)].notna().all(axis=1).to_numpy()
+    kwargs = {col: col_type(*con.read_arrays(col, df, rows)) for col, col_type in args.items()}
+
+    return lambda: cal.calc_columns(**kwargs)
+
+def case_kernel_round(df: pd.DataFrame) -> Callable[[], object]:
+    def round_all():
+        errs_r = rou.round_errs(errs)
+        rou.round_vals(vals, errs_r)
+
+    rou = err.Round()
+    vals, errs, _ = MeasureConverter().read_arrays("mass", df)
+
+    return round_all
+
+def case_kernel_star_reduce(df: pd.DataFrame) -> Callable[[], object]:
+    star_calc = StarCalculator(err.Round(), ms.StarMass)
+
+    star_mass = df.dropna(subset=["star_name", "star_mass"])
+    codes, stars = pd.factorize(star_mass["star_name"])
+    vals, err_mins, err_maxs = MeasureConverter().read_arrays("star_mass", star_mass)
+
+    return lambda: star_calc.calc_columns(codes, vals, err_mins, err_maxs, len(stars))
+
+def case_merge(df: pd.DataFrame) -> Callable[[], object]:
+    other = df.sample(frac=0.5, random_state=122)
+    other["name"] = other["name"].str.upper().str.replace(" ", "_")
+    other["mass_error_min"] = other["mass_error_min"] / 2
+
+    return lambda: merge_catalogues([df, other])
+
+def case_sp_class_table(df: pd.DataFrame) -> Callable[[], object]:
+    def lookup_all():
+        for sp_type in sp_types:
+            table.get_ms(sp_type)
+
+    table = tab.SpClassTeffTable(tab.SP_CLASS_TABLE)
+    sp_types = df["star_sp_type"].dropna().to_list()
+
+    return lookup_all
+
+def case_mass_radius_cleaner(df: pd.DataFrame) -> Callable[[], object]:
+    cleaner = oucl.MassRadiusOutlierCleaner(5, 10, tree_count=10, seed=122)
+    mr_df = _mass_radius(df)
+
+    return lambda: cleaner.clean(mr_df, 0.1)
+
+def case_sp_mass_cleaner(df: pd.DataFrame) -> Callable[[], object]:
+    cleaner = oucl.SPMassOutlierCleaner()
+    sm_df = _mass_radius(df).dropna(subset=["star_mass"])
+
+    return lambda: cleaner.clean(sm_df)
+
+def case_teff_radius_cleaner(df: pd.DataFrame) -> Callable[[], object]:
+    cleaner = oucl.LargePTeffRadiusCleaner()
+    rt_df = _radius_teff(df)
+
+    return lambda: cleaner.clean(rt_df)
+
+def case_mass_radius_regression(df: pd.DataFrame) -> Callable[[], object]:
+    reg = model.MassRadiusLogRegression(it=1)
+    mr_df = _mass_radius(df)
+
+    return lambda: reg.learn(mr_df)
+
+def case_cluster_regression(df: pd.DataFrame) -> Callable[[], object]:
+    make = partial(model.MassRadiusLogRegression, it=1)
+
+    mr_df = _mass_radius(df)
+    small = mr_df["mass"] < mr_df["mass"].median()
+    cl_dfs = {0: mr_df[small], 1: mr_df[~small]}
+
+    return lambda: model.RegressionRouter.learn(make, cl_dfs)
+
+def case_radius_teff_regression(df: pd.DataFrame) -> Callable[[], object]:
+    reg = model.RadiusLogTeffRegression(it=1, alpha_int=(0, 100), eps=1.0)
+    rt_df = _radius_teff(df)
+
+    return lambda: reg.learn(rt_df)
+
+CASES = {
+    "catalogue_load": case_catalogue_load,
+    "converter_read": case_converter_read,
+    "converter_write": case_converter_write,
+    "error_gen": case_error_gen,
+    "star_table": case_star_table,
+    "star_teff_by_sp_class": case_star_teff_by_sp_class,
+    "semi_major_axis": case_semi_major_axis,
+    "planet_teff_mean": case_planet_teff_mean,
+    "planet_teff_range": case_planet_teff_range,
+    "star_mass": case_star_mass,
+    "star_calculator": case_star_calculator,
+    "measure_alloc": case_measure_alloc,
+    "round": case_round,
+    "kernel_planet_teff": case_kernel_planet_teff,
+    "kernel_round": case_kernel_round,
+    "kernel_star_reduce": case_kernel_star_reduce,
+    "merge": case_merge,
+    "sp_class_table": case_sp_class_table,
+    "mass_radius_cleaner": case_mass_radius_cleaner,
+    "sp_mass_cleaner": case_sp_mass_cleaner,
+    "teff_radius_cleaner": case_teff_radius_cleaner,
+    "mass_radius_regression": case_mass_radius_regression,
+    "cluster_regression": case_cluster_regression,
+    "radius_teff_regression": case_radius_teff_regression,
+}
+
+def time_case(run: Callable[[], object], repeat: int) -> list[float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    return times
+
+def peak_memory(run: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+
+    finally:
+        tracemalloc.stop()
+
+    return peak
+
+def time_import(module: str, repeat: int) -> list[float]:
+    code = "import time; t = time.perf_counter(); import {0}; print(time.perf_counter() - t)".format(module)
+    cwd = os.path.dirname(os.path.abspath(__file__))
+
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=cwd, check=True, capture_output=True, text=True)
+        times.append(float(out.stdout))
+
+    return times
+
+def run_import_benchmarks(modules: list[str], repeat=3) -> list[dict]:
+    results = []
+    for module in modules:
+        times = time_import(module, repeat)
+
+        results.append({
+            "case": "import:{0}".format(module),
+            "rows": 0,
+            "repeat": repeat,
+            "best_s": min(times),
+            "mean_s": sum(times) / len(times),
+        })
+        print("{0:<24} {1:>10} {2:>12.4f} s".format("import " + module, "", min(times)), file=sys.stderr)
+
+    return results
+
+def run_benchmarks(cases: list[str], sizes: list[int], repeat=3, budget=60.0, seed=0,
+                   memory=False) -> dict:
+    results = []
+    over_budget = set()
+    for rows in sizes:
+        df = gen_catalogue(rows, seed)
+
+        for case in cases:
+            if case in over_budget:
+                results.append({"case": case, "rows": rows, "skipped": True})
+                continue
+
+            run = CASES[case](df)
+            times = time_case(run, repeat)
+
+            result = {
+                "case": case,
+                "rows": rows,
+                "repeat": repeat,
+                "best_s": min(times),
+                "mean_s": sum(times) / len(times),
+            }
+            if memory:
+                result["peak_mem"] = peak_memory(run)
+
+            results.append(result)
+            print("{0:<24} {1:>10} {2:>12.4f} s".format(case, rows, min(times)), file=sys.stderr)
+
+            if sum(times) > budget:
+                over_budget.add(case)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "seed": seed,
+            "kernel_backend": kernels.backend(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+    return report
+
+def compare(report: dict, baseline: dict, threshold: float) -> list[str]:
+    def timings(rep: dict) -> dict[tuple[str, int], float]:
+        return {(r["case"], r["rows"]): r["best_s"] for r in rep["results"] if not r.get("skipped")}
+
+    cur_t = timings(report)
+    base_t = timings(baseline)
+
+    regressions = []
+    for key in sorted(cur_t.keys() & base_t.keys()):
+        ratio = cur_t[key] / base_t[key]
+        if ratio > threshold:
+            regressions.append("{0} @ {1} rows: {2:.2f}x slower".format(key[0], key[1], ratio))
+
+    return regressions
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark transformers, calculators and models on a synthetic catalogue")
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=60.0,
+                        help="skip larger sizes of a case once its repeats took longer than this, seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memory", action="store_true", help="also record the traced peak memory of one run")
+    parser.add_argument("--imports", action="store_true", help="also time a cold import of each module")
+    parser.add_argument("--kernel-backend", default="auto", choices=["auto", *kernels.BACKENDS],
+                        help="compiled-kernel backend for the kernel_* cases")
+    parser.add_argument("--out", default="bench.json")
+    parser.add_argument("--compare", help="baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=1.1)
+    args = parser.parse_args(argv)
+
+    kernels.set_backend(args.kernel_backend)
+
+    report = run_benchmarks(args.cases, sorted(args.sizes), args.repeat, args.budget, args.seed,
+                            args.memory)
+    if args.imports:
+        report["results"].extend(run_import_benchmarks(IMPORT_MODULES, args.repeat))
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        regressions = compare(report, baseline, args.threshold)
+        for r in regressions:
+            print(r)
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,23 @@
+import numpy as np
 from numpy import power, sqrt, pi
 from abc import ABC, abstractmethod
-from typing import Tuple
+from typing import Tuple, Callable, Dict, Iterable
 from collections import namedtuple
 import measures as ms
+import errors as err
+import memo
+import units as u
+import instrumentation as ins
+import kernels
 import re
 
 G = 6.6743e-11
 G_RERR = 5e-5
 
+SM_AXIS_K = G * u.scale({"sol_mass": 1, "day": 2, "au": -3}) / (4 * pi ** 2)
+STAR_MASS_K = 4 * pi ** 2 * u.scale({"au": 3, "day": -2, "sol_mass": -1}) / G
+STAR_R_AU = u.factor("sol_radius", "au")
+
 class Calculator(ABC):
     def __init__(self, ms_type: type) -> None:
         self.__ms_type = ms_type
@@ -24,6 +34,7 @@ class Calculator(ABC):
     def ferr_max(self, val: float, *args, **kwargs) -> float:
         return 0.0
 
+    @ins.call
     def calc(self, *args, **kwargs):
         val = self.fval(*args, **kwargs)
         err_min = self.ferr_min(val, *args, **kwargs)
@@ -31,6 +42,60 @@ class Calculator(ABC):
 
         ms = self.__ms_type(val, err_min, err_max)
         return ms
+
+    def calc_columns(self, *args, **kwargs):
+        return self.calc(*args, **kwargs)
+
+    @property
+    def ms_type(self) -> type:
+        return self.__ms_type
+
+
+class MemoCalculator(Calculator):
+    def __init__(self, cal: Calculator, capacity: int = 4096, eviction="lru") -> None:
+        super().__init__(cal.ms_type)
+        self.__cal = cal
+        self.__cache = memo.MemoCache(capacity, eviction)
+
+    def __key_item(self, arg) -> object:
+        if isinstance(arg, ms.Measure):
+            return (memo.key_val(arg.val), memo.key_val(arg.err_min), memo.key_val(arg.err_max))
+
+        return memo.key_val(arg)
+
+    def __key(self, args: tuple, kwargs: dict) -> tuple:
+        key_args = tuple(map(self.__key_item, args))
+        key_kwargs = tuple(sorted((k, self.__key_item(v)) for k, v in kwargs.items()))
+
+        return key_args, key_kwargs
+
+    def fval(self, *args, **kwargs) -> float:
+        return self.__cal.fval(*args, **kwargs)
+
+    def ferr_min(self, val: float, *args, **kwargs) -> float:
+        return self.__cal.ferr_min(val, *args, **kwargs)
+
+    def ferr_max(self, val: float, *args, **kwargs) -> float:
+        return self.__cal.ferr_max(val, *args, **kwargs)
+
+    def calc(self, *args, **kwargs):
+        cal = self.__cal
+        cache = self.__cache
+
+        key = self.__key(args, kwargs)
+        calc_ms = cache.get_or_calc(key, lambda: cal.calc(*args, **kwargs))
+
+        return calc_ms
+
+    def calc_columns(self, *args, **kwargs):
+        return self.__cal.calc_columns(*args, **kwargs)
+
+    @property
+    def stats(self) -> memo.CacheStats:
+        return self.__cache.stats
+
+    def clear(self) -> None:
+        self.__cache.clear()
     
 
 class SemiMajorAxisCalc(Calculator):
@@ -38,11 +103,10 @@ class SemiMajorAxisCalc(Calculator):
         super().__init__(ms.SemiMajorAxis)
 
     def fval(self, *args, **kwargs) -> float:
-        star_m = kwargs["star_mass"].val_kg
-        period = kwargs["orbital_period"].val_s
+        star_m = kwargs["star_mass"].val
+        period = kwargs["orbital_period"].val
 
-        sm_axis_m = power((G * star_m * period ** 2) / (4 * pi ** 2), 1 / 3)
-        sm_axis = sm_axis_m / ms.AU_M
+        sm_axis = power(SM_AXIS_K * star_m * period ** 2, 1 / 3)
 
         return sm_axis
 
@@ -75,8 +139,8 @@ class PlanetTeffCalc(Calculator):
 
     def fval(self, *args, **kwargs) -> float:
         star_t = kwargs["star_teff"].val
-        star_r = kwargs["star_radius"].val_m
-        sm_axis = kwargs["semi_major_axis"].val_m
+        star_r = kwargs["star_radius"].val * STAR_R_AU
+        sm_axis = kwargs["semi_major_axis"].val
 
         alb = kwargs.get("alb").val if kwargs.get("alb") is not None else 0
         ecc = kwargs.get("eccentricity").val if kwargs.get("eccentricity") is not None else 0
@@ -149,17 +213,78 @@ class PlanetTeffCalc(Calculator):
                                    alb_rerr_max, ecc, ecc_err_max, ttype)
         
         return teff_err_max
+
+    def calc_columns(self, *args, **kwargs):
+        ttype = kernels.ttype_code(kwargs.get("ttype", "mean"))
+
+        val, err_min, err_max = kernels.run_threaded(kernels.planet_teff, _planet_teff_arrays(kwargs),
+                                                     STAR_R_AU, ttype)
+
+        calc_ms = self.ms_type(val, err_min, err_max)
+        return calc_ms
+
+
+class PlanetTeffRangeCalc:
+    TTYPES = ("min", "mean", "max")
+
+    def __init__(self) -> None:
+        self.__cal = PlanetTeffCalc()
+
+    @property
+    def ms_type(self) -> type:
+        return self.__cal.ms_type
+
+    def calc(self, *args, **kwargs) -> Dict[str, ms.Measure]:
+        cal = self.__cal
+
+        calc_mss = {ttype: cal.calc(*args, **kwargs, ttype=ttype) for ttype in self.TTYPES}
+        return calc_mss
+
+    def calc_columns(self, *args, **kwargs) -> Dict[str, ms.Measure]:
+        ms_type = self.ms_type
+
+        out = kernels.run_threaded(kernels.planet_teff_range, _planet_teff_arrays(kwargs), STAR_R_AU)
+
+        calc_mss = {ttype: ms_type(out[3 * i], out[3 * i + 1], out[3 * i + 2])
+                    for i, ttype in enumerate(self.TTYPES)}
+        return calc_mss
+
+
+def _planet_teff_arrays(kwargs: dict) -> list[np.ndarray]:
+    def col_arrs(arg: str, n: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        arg_ms = kwargs.get(arg)
+        if arg_ms is None:
+            return np.zeros(n), np.zeros(n), np.zeros(n)
+
+        return tuple(np.broadcast_to(np.asarray(a, dtype=np.float64), (n,))
+                     for a in (arg_ms.val, arg_ms.err_min, arg_ms.err_max))
+
+    n = np.size(kwargs["star_teff"].val)
+
+    star_t = col_arrs("star_teff", n)
+    star_r = col_arrs("star_radius", n)
+    sm_axis = col_arrs("semi_major_axis", n)
+    ecc = col_arrs("eccentricity", n)
+
+    alb, alb_err_min, alb_err_max = col_arrs("alb", n)
+    if kwargs.get("alb") is not None:
+        alb_rerr_min, alb_rerr_max = alb_err_min / alb, alb_err_max / alb
+
+    else:
+        alb_rerr_min, alb_rerr_max = alb_err_min, alb_err_max
+
+    return [*star_t, *star_r, *sm_axis, *ecc, alb, alb_rerr_min, alb_rerr_max]
+
     
 class StarMassCalc(Calculator):
     def __init__(self) -> None:
         super().__init__(ms.StarMass)
 
     def fval(self, *args, **kwargs) -> float:
-        period = kwargs["orbital_period"].val_s
-        sm_axis = kwargs["semi_major_axis"].val_m
+        period = kwargs["orbital_period"].val
+        sm_axis = kwargs["semi_major_axis"].val
 
-        star_mass_kg = (4 * (pi ** 2) * (sm_axis ** 3)) / (G * period ** 2)
-        star_mass = star_mass_kg / ms.SOL_MASS_KG
+        star_mass = STAR_MASS_K * sm_axis ** 3 / period ** 2
 
         return star_mass
     
@@ -183,4 +308,113 @@ class StarMassCalc(Calculator):
 
         err_max = self.__ferr(val, period_remax, sm_axis_remax)
 
-        return err_max
\ No newline at end of file
+        return err_max
+
+
+Derivation = namedtuple("Derivation", ["col", "col_type", "cal", "args", "kwargs"], defaults=[None])
+LazyColumn = namedtuple("LazyColumn", ["val", "err_min", "err_max", "filled"])
+
+class LazyGraph:
+    def __init__(self, derivations: Iterable[Derivation], rou: err.Round) -> None:
+        self.__derivs = {d.col: d for d in derivations}
+        self.__rou = rou
+
+    @property
+    def derivations(self) -> Dict[str, Derivation]:
+        return self.__derivs
+
+    def inputs(self, outputs: Iterable[str]) -> set[str]:
+        derivs = self.__derivs
+
+        cols = set()
+        todo = list(outputs)
+        while todo:
+            col = todo.pop()
+            if col in cols:
+                continue
+
+            cols.add(col)
+            if col in derivs:
+                todo.extend(derivs[col].args.keys())
+
+        return cols
+
+    def evaluate(self, source: Callable[[str], Tuple[np.ndarray, np.ndarray, np.ndarray]], n: int,
+                 outputs: Iterable[str]) -> Dict[str, LazyColumn]:
+        def load(col: str) -> dict:
+            if col not in cache:
+                col_arrs = source(col)
+                if col_arrs is None:
+                    col_arrs = tuple(np.full(n, np.nan) for _ in range(3))
+
+                val, err_min, err_max = col_arrs
+                cache[col] = {
+                    "val": val,
+                    "err_min": err_min,
+                    "err_max": err_max,
+                    "resolved": ~np.isnan(val),
+                    "tried": np.zeros(n, dtype=bool),
+                    "filled": np.zeros(n, dtype=bool),
+                }
+
+            return cache[col]
+
+        def resolve(col: str, rows: np.ndarray, active: set[str]) -> None:
+            entry = load(col)
+
+            deriv = derivs.get(col)
+            if deriv is None or col in active:
+                return
+
+            todo = rows[~(entry["resolved"][rows] | entry["tried"][rows])]
+            if not len(todo):
+                return
+
+            active.add(col)
+            for arg in deriv.args:
+                resolve(arg, todo, active)
+            active.remove(col)
+
+            entry["tried"][todo] = True
+
+            has_args = np.ones(len(todo), dtype=bool)
+            for arg in deriv.args:
+                has_args &= cache[arg]["resolved"][todo]
+
+            calc_rows = todo[has_args]
+            if not len(calc_rows):
+                return
+
+            kwargs = {}
+            for arg, arg_type in deriv.args.items():
+                arg_entry = cache[arg]
+                kwargs[arg] = arg_type(arg_entry["val"][calc_rows],
+                                       arg_entry["err_min"][calc_rows],
+                                       arg_entry["err_max"][calc_rows])
+
+            calc_ms = deriv.cal.calc_columns(**kwargs, **(deriv.kwargs or {}))
+
+            err_r = rou.round_errs(np.broadcast_to(calc_ms.err, calc_rows.shape))
+            val_r = rou.round_vals(np.broadcast_to(calc_ms.val, calc_rows.shape), err_r)
+
+            entry["val"][calc_rows] = val_r
+            entry["err_min"][calc_rows] = err_r
+            entry["err_max"][calc_rows] = err_r
+            entry["resolved"][calc_rows] = ~np.isnan(val_r)
+            entry["filled"][calc_rows] = True
+
+        derivs = self.__derivs
+        rou = self.__rou
+
+        cache = {}
+        all_rows = np.arange(n)
+        outputs = list(outputs)
+        for col in outputs:
+            resolve(col, all_rows, set())
+
+        cols = {}
+        for col in outputs:
+            entry = cache[col]
+            cols[col] = LazyColumn(entry["val"], entry["err_min"], entry["err_max"], entry["filled"])
+
+        return cols
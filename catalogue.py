@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+from typing import Iterable
+
+MEASURE_COLS = [
+    "mass",
+    "radius",
+    "orbital_period",
+    "semi_major_axis",
+    "eccentricity",
+    "temp_calculated",
+    "star_distance",
+    "star_metallicity",
+    "star_mass",
+    "star_radius",
+    "star_teff",
+]
+
+VAL_COLS = [
+    "temp_measured",
+    "mag_v",
+]
+
+STR_COLS = [
+    "name",
+    "star_name",
+    "star_sp_type",
+]
+
+COLS = [
+    "name",
+    "mass",
+    "mass_error_min",
+    "mass_error_max",
+    "radius",
+    "radius_error_min",
+    "radius_error_max",
+    "orbital_period",
+    "orbital_period_error_min",
+    "orbital_period_error_max",
+    "semi_major_axis",
+    "semi_major_axis_error_min",
+    "semi_major_axis_error_max",
+    "eccentricity",
+    "eccentricity_error_min",
+    "eccentricity_error_max",
+    "temp_calculated",
+    "temp_calculated_error_min",
+    "temp_calculated_error_max",
+    "temp_measured",
+    "star_name",
+    "mag_v",
+    "star_distance",
+    "star_distance_error_min",
+    "star_distance_error_max",
+    "star_sp_type",
+    "star_metallicity",
+    "star_metallicity_error_min",
+    "star_metallicity_error_max",
+    "star_mass",
+    "star_mass_error_min",
+    "star_mass_error_max",
+    "star_radius",
+    "star_radius_error_min",
+    "star_radius_error_max",
+    "star_teff",
+    "star_teff_error_min",
+    "star_teff_error_max",
+]
+
+def err_min_col(name: str) -> str:
+    return "{name}_error_min".format(name=name)
+
+def err_max_col(name: str) -> str:
+    return "{name}_error_max".format(name=name)
+
+def is_err_col(col: str) -> bool:
+    return col.endswith("_error_min") or col.endswith("_error_max")
+
+CATEGORY_COLS = [
+    "star_name",
+    "star_sp_type",
+]
+
+def _default_engine() -> str:
+    try:
+        import pyarrow
+
+    except ImportError:
+        return "c"
+
+    return "pyarrow"
+
+
+class CatalogueLoader:
+    def __init__(self, cols: list[str] = COLS, float32_errors=False, engine: str = None) -> None:
+        self.__cols = list(cols)
+        self.__float32_errors = float32_errors
+        self.__engine = engine or _default_engine()
+
+    def __col_dtype(self, col: str) -> object:
+        if col in CATEGORY_COLS:
+            return "category"
+
+        if col in STR_COLS:
+            return str
+
+        if is_err_col(col) and self.__float32_errors:
+            return np.float32
+
+        return np.float64
+
+    @property
+    def dtypes(self) -> dict[str, object]:
+        dtypes = {col: self.__col_dtype(col) for col in self.__cols}
+
+        return dtypes
+
+    def __reorder(self, df: pd.DataFrame) -> pd.DataFrame:
+        cols = self.__cols
+        if list(df.columns) == cols:
+            return df
+
+        return df[cols]
+
+    def load(self, path: str) -> pd.DataFrame:
+        cols = self.__cols
+
+        df = pd.read_csv(path, usecols=cols, dtype=self.dtypes, engine=self.__engine)
+
+        return self.__reorder(df)
+
+    def iter_chunks(self, path: str, chunk_size: int) -> Iterable[pd.DataFrame]:
+        cols = self.__cols
+
+        reader = pd.read_csv(path, usecols=cols, dtype=self.dtypes, engine="c", chunksize=chunk_size)
+        with reader:
+            for chunk in reader:
+                yield self.__reorder(chunk)
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import numpy as np
+from typing import Callable, Iterable
+
+def data_fingerprint(*arrays: Iterable[float]) -> str:
+    h = hashlib.sha1()
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr, dtype=np.float64)
+
+        h.update(repr(arr.shape).encode())
+        h.update(arr.tobytes())
+
+    return h.hexdigest()
+
+def _key(key: object) -> str:
+    return json.dumps(key, sort_keys=True)
+
+
+class SearchCheckpoint:
+    def __init__(self, path: str, fingerprint: str, space: dict[str, object]) -> None:
+        self.__path = path
+        self.__header = {"fingerprint": fingerprint, "space": space}
+        self.__results = {}
+
+        if path:
+            self.__load()
+
+    def __load(self) -> None:
+        path = self.__path
+        header = self.__header
+
+        results = {}
+        if os.path.exists(path):
+            with open(path, "r") as cf:
+                lines = cf.read().splitlines()
+
+            records = []
+            for line in lines:
+                try:
+                    records.append(json.loads(line))
+
+                except json.JSONDecodeError:
+                    break
+
+            if records and records[0] == json.loads(json.dumps(header)):
+                results = {_key(r["key"]): r["scores"] for r in records[1:]}
+
+        dir_name = os.path.dirname(path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+
+        with open(path, "w") as cf:
+            cf.write(json.dumps(header) + "\n")
+            for key, scores in results.items():
+                cf.write(json.dumps({"key": json.loads(key), "scores": scores}) + "\n")
+
+        self.__results = results
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    def __len__(self) -> int:
+        return len(self.__results)
+
+    def __contains__(self, key: object) -> bool:
+        return _key(key) in self.__results
+
+    def get(self, key: object) -> np.ndarray:
+        scores = self.__results.get(_key(key))
+        if scores is None:
+            return None
+
+        return np.array(scores, dtype=np.float64)
+
+    def put(self, key: object, scores: Iterable[float]) -> None:
+        scores = np.asarray(scores, dtype=np.float64).tolist()
+        self.__results[_key(key)] = scores
+
+        path = self.__path
+        if not path:
+            return
+
+        with open(path, "a") as cf:
+            cf.write(json.dumps({"key": key, "scores": scores}) + "\n")
+            cf.flush()
+            os.fsync(cf.fileno())
+
+    def get_or_run(self, key: object, f: Callable[[], Iterable[float]]) -> np.ndarray:
+        scores = self.get(key)
+        if scores is None:
+            scores = np.asarray(f(), dtype=np.float64)
+            self.put(key, scores)
+
+        return scores
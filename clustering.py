@@ -1,32 +1,181 @@
-import sklearn.mixture as mx
-import sklearn.cluster as clu
+import copy
 import numpy as np
-from sklearn.model_selection import train_test_split
 import pandas as pd
 from abc import ABC, abstractmethod
 from typing import Iterable
 import consts as c
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from lazy import LazyModule
 
-class MassRadiusClusterer:
-    def __init__(self, n_components: int) -> None:
-        self.__clstrr = mx.GaussianMixture(n_components=n_components)
+mx = LazyModule("sklearn.mixture")
 
-    def learn(self, df: pd.DataFrame) -> Iterable[pd.DataFrame]:
-        clstrr = self.__clstrr
+_sweep_stack = None
+
+def _init_sweep(mr_stack: np.ndarray) -> None:
+    global _sweep_stack
+    _sweep_stack = mr_stack
+
+def _fit_candidate(n_components: int, seed: int) -> tuple["mx.GaussianMixture", float, float, bool]:
+    mr_stack = _sweep_stack
+
+    clstrr = mx.GaussianMixture(n_components=n_components, random_state=seed)
+    clstrr.fit(mr_stack)
+
+    bic = clstrr.bic(mr_stack)
+    aic = clstrr.aic(mr_stack)
 
+    return clstrr, bic, aic, clstrr.converged_
+
+
+class MassRadiusClusterer:
+    def __init__(self, n_components: int, sample_size: int = None, chunk_size: int = None,
+                 warm_start=False, seed=None) -> None:
+        self.__clstrr = mx.GaussianMixture(n_components=n_components, warm_start=warm_start,
+                                           random_state=seed)
+        self.__warm_start = warm_start
+        self.__sample_size = sample_size
+        self.__chunk_size = chunk_size
+        self.__rng = np.random.default_rng(seed)
+        self.__sweep_models = {}
+
+    def __mr_stack(self, df: pd.DataFrame) -> np.ndarray:
         mlog = c.mass_log(df)
         rlog = c.radius_log(df)
 
         mr_stack = np.column_stack((mlog, rlog))
-        cllab = clstrr.fit_predict(mr_stack)
 
-        cls = list(set(cllab.tolist()))
+        return mr_stack
+
+    def __fit(self, mr_stack: np.ndarray) -> None:
+        clstrr = self.__clstrr
+        sample_size = self.__sample_size
+        rng = self.__rng
+
+        if sample_size and sample_size < len(mr_stack):
+            sample_idx = rng.choice(len(mr_stack), size=sample_size, replace=False)
+            clstrr.fit(mr_stack[sample_idx])
+
+        else:
+            clstrr.fit(mr_stack)
+
+    def __predict(self, mr_stack: np.ndarray) -> np.ndarray:
+        clstrr = self.__clstrr
+        chunk_size = self.__chunk_size
+
+        if not chunk_size:
+            cllab = clstrr.predict(mr_stack)
+            return cllab
+
+        cllab = np.empty(len(mr_stack), dtype=np.intp)
+        for start in range(0, len(mr_stack), chunk_size):
+            stop = start + chunk_size
+            cllab[start:stop] = clstrr.predict(mr_stack[start:stop])
+
+        return cllab
+
+    def __split_index(self, cllab: np.ndarray) -> dict[int, np.ndarray]:
+        order = np.argsort(cllab, kind="stable")
+        cls, starts = np.unique(cllab[order], return_index=True)
+
+        cl_idxs = np.split(order, starts[1:])
+        cl_index = dict(zip(cls.tolist(), cl_idxs))
+
+        return cl_index
+
+    def __fingerprint(self, mr_stack: np.ndarray) -> str:
+        fingerprint = hashlib.sha1(np.ascontiguousarray(mr_stack).tobytes()).hexdigest()
+
+        return fingerprint
+
+    def sweep(self, df: pd.DataFrame, n_components_vals: Iterable[int], seeds: Iterable[int] = (0,),
+              criterion="bic", workers: int = None) -> pd.DataFrame:
+        if criterion not in ("bic", "aic"):
+            raise ValueError("criterion argument can only has either \"bic\" or \"aic\" values, not \"{criterion}\"".format(criterion=criterion))
+
+        sweep_models = self.__sweep_models
+
+        mr_stack = self.__mr_stack(df)
+        fingerprint = self.__fingerprint(mr_stack)
+
+        cands = list(product(n_components_vals, seeds))
+        new_cands = [cand for cand in cands if (fingerprint, *cand) not in sweep_models]
+
+        if new_cands:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_sweep, initargs=(mr_stack,)) as ex:
+                n_comps, cand_seeds = zip(*new_cands)
+                fits = ex.map(_fit_candidate, n_comps, cand_seeds)
+
+                for cand, fit in zip(new_cands, fits):
+                    sweep_models[(fingerprint, *cand)] = fit
+
+        rows = []
+        for n_components, seed in cands:
+            _, bic, aic, converged = sweep_models[(fingerprint, n_components, seed)]
+            rows.append((n_components, seed, bic, aic, converged))
+
+        scores = pd.DataFrame(rows, columns=["n_components", "seed", "bic", "aic", "converged"])
+        scores = scores.sort_values(criterion, ignore_index=True)
+
+        best = scores.iloc[0]
+        best_clstrr = copy.deepcopy(sweep_models[(fingerprint, int(best.n_components), int(best.seed))][0])
+        best_clstrr.set_params(warm_start=self.__warm_start)
+
+        self.__clstrr = best_clstrr
+
+        return scores
+
+    def sweep_model(self, df: pd.DataFrame, n_components: int, seed: int) -> "mx.GaussianMixture":
+        mr_stack = self.__mr_stack(df)
+        fingerprint = self.__fingerprint(mr_stack)
+
+        clstrr = self.__sweep_models[(fingerprint, n_components, seed)][0]
+
+        return clstrr
+
+    def init_from(self, means: np.ndarray, covariances: np.ndarray, weights: np.ndarray) -> None:
+        clstrr = self.__clstrr
+
+        precisions = np.linalg.inv(covariances)
+        clstrr.set_params(means_init=means, precisions_init=precisions, weights_init=weights)
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        mr_stack = self.__mr_stack(df)
+        cllab = self.__predict(mr_stack)
+
+        return cllab
+
+    def learn_index(self, df: pd.DataFrame) -> dict[int, np.ndarray]:
+        mr_stack = self.__mr_stack(df)
+
+        self.__fit(mr_stack)
+        cllab = self.__predict(mr_stack)
+
+        cl_index = self.__split_index(cllab)
+
+        return cl_index
+
+    def learn_frames(self, df: pd.DataFrame) -> dict[int, pd.DataFrame]:
+        cl_index = self.learn_index(df)
+
+        cl_dfs = {cl: df.iloc[cl_idx] for cl, cl_idx in cl_index.items()}
+
+        return cl_dfs
+
+    def learn(self, df: pd.DataFrame) -> Iterable[pd.DataFrame]:
+        dfs_list = list(self.learn_frames(df).values())
+
+        return dfs_list
 
-        dfs_list = []
-        for cl in cls:
-            mask = list(map(lambda x: x == cl, cllab))
+    @property
+    def means(self) -> np.ndarray:
+        return self.__clstrr.means_
 
-            cl_df = df[mask]
-            dfs_list.append(cl_df)
+    @property
+    def covariances(self) -> np.ndarray:
+        return self.__clstrr.covariances_
 
-        return dfs_list
\ No newline at end of file
+    @property
+    def weights(self) -> np.ndarray:
+        return self.__clstrr.weights_
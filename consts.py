@@ -1,11 +1,14 @@
 import pandas as pd
 import numpy as np
+import units as u
 
-JUP_MASS_EARTH = 316.8
-JUP_RAD_EARTH = 11.2
+JUP_MASS_EARTH = u.JUP_MASS_EARTH
+JUP_RAD_EARTH = u.JUP_RAD_EARTH
 
 def mass_log(df: pd.DataFrame) -> list[float]:
-    return df["mass"].apply(lambda x: np.log10(x * JUP_MASS_EARTH)).to_list()
+    mass = df["mass"].to_numpy(dtype=float)
+    return np.log10(u.convert(mass, "jup_mass", "earth_mass")).tolist()
     
 def radius_log(df: pd.DataFrame) -> list[float]:
-    return df["radius"].apply(lambda x: np.log10(x * JUP_RAD_EARTH)).to_list()
\ No newline at end of file
+    radius = df["radius"].to_numpy(dtype=float)
+    return np.log10(u.convert(radius, "jup_radius", "earth_radius")).tolist()
\ No newline at end of file
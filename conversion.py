@@ -1,5 +1,7 @@
 import pandas as pd
+import numpy as np
 import measures as ms
+import instrumentation as ins
 from typing import Iterable, Callable
 
 class MeasureConverter:
@@ -27,6 +29,55 @@ class MeasureConverter:
             measure = ms_type(val, err_min, err_max)
             yield measure
 
+    def __col_array(self, col: str, df: pd.DataFrame, rows: np.ndarray = None) -> np.ndarray:
+        if col not in df:
+            size = len(df) if rows is None else len(rows)
+            return np.full(size, np.nan)
+
+        if rows is None:
+            col_arr = df[col].to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+            return col_arr
+
+        col_arr = df[col].to_numpy(dtype=np.float64, na_value=np.nan)[rows]
+        return col_arr
+
+    def read_arrays(self, name: str, df: pd.DataFrame,
+                    rows: np.ndarray = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        vals = self.__col_array(name, df, rows)
+        err_mins = self.__col_array(self.__err_min_col(name), df, rows)
+        err_maxs = self.__col_array(self.__err_max_col(name), df, rows)
+
+        return vals, err_mins, err_maxs
+
+    def __col_dtype(self, col: str, df: pd.DataFrame) -> object:
+        if col in df:
+            return df[col].dtype
+
+    def write_arrays(self, name: str, vals: np.ndarray, err_mins: np.ndarray, err_maxs: np.ndarray,
+                     df: pd.DataFrame, rows: np.ndarray = None, copy=True) -> pd.DataFrame:
+        new_df = df
+        if copy:
+            new_df = df.copy()
+            ins.count("copies")
+
+        err_min_col = self.__err_min_col(name)
+        err_max_col = self.__err_max_col(name)
+
+        for col, col_vals in ((name, vals), (err_min_col, err_mins), (err_max_col, err_maxs)):
+            if rows is None:
+                new_col = col_vals
+
+            elif col in new_df:
+                new_col = new_df[col].to_numpy(copy=True)
+                new_col[rows] = col_vals[rows]
+
+            else:
+                new_col = np.where(rows, col_vals, np.nan)
+
+            new_df[col] = new_col
+
+        return new_df
+
     def write(self, name: str, ms_vals: Iterable[ms.Measure], df: pd.DataFrame,
               write_val=True, write_err=True) -> pd.DataFrame:
         def get_val(ms: ms.Measure):
@@ -42,21 +93,22 @@ class MeasureConverter:
                 return ms.err_max
 
         new_df = df.copy()
+        ins.count("copies")
         err_min_col = self.__err_min_col(name)
         err_max_col = self.__err_max_col(name)
         
         if write_val:
             col_vals = list(map(get_val, ms_vals))
-            col_vals_df = pd.DataFrame({name: col_vals}, index=new_df.index)
+            col_vals_df = pd.DataFrame({name: col_vals}, index=new_df.index, dtype=self.__col_dtype(name, new_df))
             new_df.update(col_vals_df)
 
         if write_err:
             col_err_min = list(map(get_err_min, ms_vals))
-            col_err_min_df = pd.DataFrame({err_min_col: col_err_min}, index=new_df.index)
+            col_err_min_df = pd.DataFrame({err_min_col: col_err_min}, index=new_df.index, dtype=self.__col_dtype(err_min_col, new_df))
             new_df.update(col_err_min_df)
 
             col_err_max = list(map(get_err_max, ms_vals))
-            col_err_max_df = pd.DataFrame({err_max_col: col_err_max}, index=new_df.index)
+            col_err_max_df = pd.DataFrame({err_max_col: col_err_max}, index=new_df.index, dtype=self.__col_dtype(err_max_col, new_df))
             new_df.update(col_err_max_df)
 
         return new_df
@@ -64,6 +116,7 @@ class MeasureConverter:
     def write_if(self, name: str, ms_vals: list[ms.Measure], df: pd.DataFrame, cond: str,
               write_val=True, write_err=True) -> pd.DataFrame:
         new_df = df.copy()
+        ins.count("copies")
 
         ms_vals_w = ms_vals
         slice_df = df.query(cond)
@@ -84,6 +137,7 @@ class MeasureConverter:
     def write_val_if(self, name: str, ms_val: ms.Measure, df: pd.DataFrame, cond: str,
               write_val=True, write_err=True) -> pd.DataFrame:
         new_df = df.copy()
+        ins.count("copies")
 
         slice_df = df.query(cond)
         slice_df_s = len(slice_df)
@@ -4,7 +4,9 @@ import measures as ms
 import calculators as calc
 import errors as err
 import tables as tab
+import instrumentation as ins
 from conversion import MeasureConverter
+from catalogue import err_min_col, err_max_col
 from abc import ABC, abstractmethod
 from typing import Iterable, Dict
 
@@ -34,6 +36,51 @@ class DFTransformer(ABC):
 
         return new_df
 
+    def _rows_measures(self, df: pd.DataFrame, col: str, col_type: type,
+                       rows: np.ndarray) -> list[ms.Measure]:
+        con = self.__con
+
+        vals, err_mins, err_maxs = con.read_arrays(col, df, rows)
+        measures = [col_type(val, err_min, err_max)
+                    for val, err_min, err_max in zip(vals.tolist(), err_mins.tolist(), err_maxs.tolist())]
+
+        return measures
+
+    def _scatter_measures(self, df: pd.DataFrame, vals: Iterable[ms.Measure],
+                          col: str, rows: np.ndarray) -> pd.DataFrame:
+        def ms_row(ms: ms.Measure) -> tuple[float, float, float]:
+            if ms:
+                return ms.val, ms.err_min, ms.err_max
+
+            return np.nan, np.nan, np.nan
+
+        con = self.__con
+
+        fill_pos = np.flatnonzero(rows)
+        fill_arrs = np.array([ms_row(ms) for ms in vals], dtype=np.float64).reshape(-1, 3).T
+
+        col_arrs = con.read_arrays(col, df)
+        for col_arr, fill_arr in zip(col_arrs, fill_arrs):
+            col_arr[fill_pos] = np.where(np.isnan(fill_arr), col_arr[fill_pos], fill_arr)
+
+        new_df = con.write_arrays(col, *col_arrs, df, rows)
+
+        return new_df
+
+    def _count_filled(self, df: pd.DataFrame, new_df: pd.DataFrame, col: str) -> None:
+        if not ins.enabled():
+            return
+
+        cols = [col, err_min_col(col), err_max_col(col)]
+        old_vals = df[cols]
+        new_vals = new_df[cols]
+
+        changed = (old_vals.ne(new_vals) & ~(old_vals.isna() & new_vals.isna())).any(axis=1)
+        computed = int(changed.sum())
+
+        ins.count("computed", computed)
+        ins.count("passed", len(df) - computed)
+
 
 class DFCalculation(DFTransformer):
     def __init__(self, 
@@ -55,44 +102,50 @@ class DFCalculation(DFTransformer):
 
         return args_ms
 
-    def calc(self, df: pd.DataFrame) -> pd.DataFrame:
-        def arg_isna(*args):
-            isna = not all(map(lambda a: pd.notna(a.val), *args))
-            return isna
-        
-        def calc_measures(cal: calc.Calculator, rou: err.Round, col_ms: Iterable[ms.Measure],
-                          args_ms: Dict[str, Iterable[ms.Measure]]) -> Iterable[ms.Measure]:
-            for ccol, cargs in zip(col_ms, zip(*args_ms.values())):
-                if pd.notna(ccol.val):
-                    yield ccol
+    def _fill_rows(self, df: pd.DataFrame) -> np.ndarray:
+        col = self.__col
+        args = self.__args
 
-                elif arg_isna(cargs):
-                    yield None
+        fill_rows = df[col].isna().to_numpy() & df[list(args)].notna().all(axis=1).to_numpy()
 
-                else:
-                    kwcargs = dict(zip(args_ms.keys(), cargs))
+        return fill_rows
 
-                    calc_ms = cal.calc(**kwcargs)
+    def fill_index(self, df: pd.DataFrame) -> pd.Index:
+        fill_rows = self._fill_rows(df)
 
-                    rou_err = rou.round_err(calc_ms.err)
-                    
-                    rou_val = rou.round_val(calc_ms.val, rou_err)
+        return df.index[fill_rows]
 
-                    ms_t = type(calc_ms)
-                    calc_ms_rou = ms_t(rou_val, rou_err, rou_err)
+    @ins.stage
+    def calc(self, df: pd.DataFrame) -> pd.DataFrame:
+        def calc_measures(cal: calc.Calculator, rou: err.Round,
+                          args_ms: Dict[str, Iterable[ms.Measure]]) -> Iterable[ms.Measure]:
+            for cargs in zip(*args_ms.values()):
+                kwcargs = dict(zip(args_ms.keys(), cargs))
+
+                calc_ms = cal.calc(**kwcargs)
+
+                rou_err = rou.round_err(calc_ms.err)
+                
+                rou_val = rou.round_val(calc_ms.val, rou_err)
 
-                    yield calc_ms_rou
+                ms_t = type(calc_ms)
+                calc_ms_rou = ms_t(rou_val, rou_err, rou_err)
+
+                yield calc_ms_rou
 
         cal = self.__cal
         rou = self.__rou
         col = self.__col
-        col_type = self.__col_type
         args = self.__args
 
-        col_ms = self._col_measures(df, col, col_type)
-        args_ms = self._args_measures(df, args)
-        calc_ms = calc_measures(cal, rou, col_ms, args_ms)
-        new_df = self._write_measures(df, calc_ms, col)
+        fill_rows = self._fill_rows(df)
+        fill_pos = np.flatnonzero(fill_rows)
+
+        args_ms = {arg_col: self._rows_measures(df, arg_col, arg_type, fill_pos)
+                   for arg_col, arg_type in args.items()}
+        calc_ms = calc_measures(cal, rou, args_ms)
+        new_df = self._scatter_measures(df, calc_ms, col, fill_rows)
+        self._count_filled(df, new_df, col)
 
         return new_df
     
@@ -130,6 +183,113 @@ class DFPlanetTeffMeanCalc(DFCalculation):
         )
     
 
+class DFMultiCalculation(DFTransformer):
+    def __init__(self,
+                 con: MeasureConverter, cal: calc.PlanetTeffRangeCalc, rou: err.Round,
+                 cols: Dict[str, str], args: Dict[str, type], opt_args: Dict[str, type] = None
+                ) -> None:
+        super().__init__(con)
+        self.__con = con
+        self.__cal = cal
+        self.__rou = rou
+        self.__cols = cols
+        self.__args = args
+        self.__opt_args = opt_args or {}
+
+    def _fill_rows(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        cols = self.__cols
+        args = self.__args
+
+        has_args = df[list(args)].notna().all(axis=1).to_numpy()
+
+        fill_rows = {}
+        for key, col in cols.items():
+            if col in df:
+                fill_rows[key] = df[col].isna().to_numpy() & has_args
+
+            else:
+                fill_rows[key] = has_args
+
+        return fill_rows
+
+    def fill_index(self, df: pd.DataFrame) -> Dict[str, pd.Index]:
+        fill_rows = self._fill_rows(df)
+
+        return {self.__cols[key]: df.index[rows] for key, rows in fill_rows.items()}
+
+    @ins.stage
+    def calc(self, df: pd.DataFrame) -> pd.DataFrame:
+        con = self.__con
+        cal = self.__cal
+        rou = self.__rou
+        cols = self.__cols
+
+        fill_rows = self._fill_rows(df)
+        any_rows = np.logical_or.reduce(list(fill_rows.values()))
+        fill_pos = np.flatnonzero(any_rows)
+
+        kwargs = {}
+        for arg_col, arg_type in self.__args.items():
+            kwargs[arg_col] = arg_type(*con.read_arrays(arg_col, df, fill_pos))
+
+        for arg_col, arg_type in self.__opt_args.items():
+            val, err_min, err_max = con.read_arrays(arg_col, df, fill_pos)
+
+            unset = np.isnan(val)
+            kwargs[arg_col] = arg_type(np.where(unset, 0.0, val),
+                                       np.where(unset, 0.0, err_min),
+                                       np.where(unset, 0.0, err_max))
+
+        calc_mss = cal.calc_columns(**kwargs)
+
+        new_df = df.copy()
+        ins.count("copies")
+        for key, col in cols.items():
+            calc_ms = calc_mss[key]
+            rows = fill_rows[key]
+            sub_rows = rows[fill_pos]
+            col_pos = fill_pos[sub_rows]
+
+            err_r = rou.round_errs(calc_ms.err)
+            val_r = rou.round_vals(calc_ms.val, err_r)
+
+            col_arrs = con.read_arrays(col, new_df)
+            for col_arr, fill_arr in zip(col_arrs, (val_r, err_r, err_r)):
+                fill_arr = fill_arr[sub_rows]
+                col_arr[col_pos] = np.where(np.isnan(fill_arr), col_arr[col_pos], fill_arr)
+
+            new_df = con.write_arrays(col, *col_arrs, new_df, rows, copy=False)
+
+        computed = len(fill_pos)
+        ins.count("computed", computed)
+        ins.count("passed", len(df) - computed)
+
+        return new_df
+
+
+class DFPlanetTeffRangeCalc(DFMultiCalculation):
+    def __init__(self, con: MeasureConverter,
+                 cal: calc.PlanetTeffRangeCalc, rou: err.Round) -> None:
+        super().__init__(
+            con,
+            cal,
+            rou,
+            {
+                "min": "temp_periastron",
+                "mean": "temp_calculated",
+                "max": "temp_apoastron"
+            },
+            {
+                "star_teff": ms.StarTeff,
+                "star_radius": ms.StarRadius,
+                "semi_major_axis": ms.SemiMajorAxis
+            },
+            {
+                "eccentricity": ms.Eccentricity
+            }
+        )
+
+
 class DFValFromTable[TTableKey, TValIn](DFTransformer):
     def __init__(self, con: MeasureConverter, table: tab.Table[TTableKey, TValIn],
                  col: str, col_type: type, col_arg: str, col_arg_type: type) -> None:
@@ -140,31 +300,37 @@ class DFValFromTable[TTableKey, TValIn](DFTransformer):
         self.__col_arg = col_arg
         self.__col_arg_type = col_arg_type
 
-    def set_vals(self, df: pd.DataFrame) -> pd.DataFrame:
-        def vals_from_table(table: tab.Table[TTableKey, TValIn],
-                            col_vals: Iterable[ms.Measure],
-                            cargs: Iterable[TValIn]) -> Iterable[ms.Measure]:
-            for carg, col_val in zip(cargs, col_vals):
-                if col_val and pd.notna(col_val.val):
-                    yield col_val
-
-                elif not carg:
-                    yield None
-                
-                else:
-                    new_ms = table.get_ms(carg)
-                    yield new_ms
-        
-        table = self.__table
+    def __fill_args(self, df: pd.DataFrame) -> tuple[np.ndarray, list[TValIn]]:
         col = self.__col
-        col_type = self.__col_type
         col_arg = self.__col_arg
         col_arg_type = self.__col_arg_type
 
-        col_ms = self._col_measures(df, col, col_type)
-        col_args = self._col_vals(df, col_arg, col_arg_type)
-        tvals_ms = vals_from_table(table, col_ms, col_args)
-        new_df = self._write_measures(df, tvals_ms, col)
+        fill_rows = df[col].isna().to_numpy() & df[col_arg].notna().to_numpy()
+        fill_pos = np.flatnonzero(fill_rows)
+
+        cargs = self._col_vals(df.iloc[fill_pos], col_arg, col_arg_type)
+        has_args = np.array([bool(carg) for carg in cargs], dtype=bool)
+
+        fill_rows[fill_pos[~has_args]] = False
+        fill_args = [carg for carg, has_arg in zip(cargs, has_args) if has_arg]
+
+        return fill_rows, fill_args
+
+    def fill_index(self, df: pd.DataFrame) -> pd.Index:
+        fill_rows, _ = self.__fill_args(df)
+
+        return df.index[fill_rows]
+
+    @ins.stage
+    def set_vals(self, df: pd.DataFrame) -> pd.DataFrame:
+        table = self.__table
+        col = self.__col
+
+        fill_rows, fill_args = self.__fill_args(df)
+
+        tvals_ms = map(table.get_ms, fill_args)
+        new_df = self._scatter_measures(df, tvals_ms, col, fill_rows)
+        self._count_filled(df, new_df, col)
         
         return new_df
     
@@ -186,44 +352,44 @@ class DFErrorGen(DFTransformer):
                  con: MeasureConverter,  err_gen: err.ErrorGenerator,
                  col: str, col_type: type) -> None:
         super().__init__(con)
+        self.__con = con
         self.__err_gen = err_gen
         self.__col = col
         self.__col_type = col_type
 
+    @ins.stage
     def gen(self, df: pd.DataFrame) -> pd.DataFrame:
-        def gen_errs(measures: Iterable[ms.Measure], 
-                     err_gen: err.ErrorGenerator, 
-                     ms_type: type) -> Iterable[ms.Measure]:
-            def is_nonset(val) -> bool:
-                return not val or pd.isna(val)
+        def nonset(vals: np.ndarray) -> np.ndarray:
+            return np.isnan(vals) | (vals == 0)
 
-            for ms in measures:
-                if is_nonset(ms.val):
-                    yield None
+        con = self.__con
+        err_gen = self.__err_gen
+        col = self.__col
 
-                elif is_nonset(ms.err_min) and is_nonset(ms.err_max):
-                    err = err_gen.gen(ms.val)
-                    new_ms = ms_type(ms.val, err, err)
-                    yield new_ms
+        vals, err_mins, err_maxs = con.read_arrays(col, df)
 
-                elif is_nonset(ms.err_min):
-                    new_ms = ms_type(ms.val, ms.err_max, ms.err_max)
-                    yield new_ms
+        has_val = ~nonset(vals)
+        no_err_min = nonset(err_mins)
+        no_err_max = nonset(err_maxs)
 
-                elif is_nonset(ms.err_max):
-                    new_ms = ms_type(ms.val, ms.err_min, ms.err_min)
-                    yield new_ms
+        gen_rows = has_val & no_err_min & no_err_max
+        from_max_rows = has_val & no_err_min & ~no_err_max
+        from_min_rows = has_val & ~no_err_min & no_err_max
 
-                else:
-                    yield ms
+        new_err_mins = np.where(from_max_rows, err_maxs, err_mins)
+        new_err_maxs = np.where(from_min_rows, err_mins, err_maxs)
 
-        err_gen = self.__err_gen
-        col = self.__col
-        col_type = self.__col_type
+        uniq_vals, uniq_inv = np.unique(vals[gen_rows], return_inverse=True)
+        gen_errs = err_gen.gen_many(uniq_vals)[uniq_inv]
+        new_err_mins[gen_rows] = gen_errs
+        new_err_maxs[gen_rows] = gen_errs
+
+        rows = gen_rows | from_max_rows | from_min_rows
+        new_df = con.write_arrays(col, vals, new_err_mins, new_err_maxs, df, rows)
 
-        measures = self._col_measures(df, col, col_type)
-        new_measures = gen_errs(measures, err_gen, col_type)
-        new_df = self._write_measures(df, new_measures, col)
+        computed = int(rows.sum())
+        ins.count("computed", computed)
+        ins.count("passed", len(df) - computed)
 
         return new_df
     
@@ -238,6 +404,7 @@ class DFStarCalculator(DFCalculation):
         self.__col_type = col_type
         self.__star_calc = star_calc_t(rou, col_type)
 
+    @ins.stage
     def calc(self, df: pd.DataFrame) -> pd.DataFrame:
         def get_stars(df: pd.DataFrame) -> Iterable[str]:
             col = self.__col
@@ -274,6 +441,8 @@ class DFStarCalculator(DFCalculation):
             
             new_df = write_star(new_df, con, s_ms, col, star)
 
+        self._count_filled(df, new_df, col)
+
         return new_df
     
 
@@ -290,4 +459,69 @@ class DFStarMassCalculator(DFStarCalculator):
                 "semi_major_axis": ms.SemiMajorAxis,
                 "orbital_period": ms.OrbitalPeriod
             }
-        )
\ No newline at end of file
+        )
+
+
+class DFLazyCalculation(DFTransformer):
+    def __init__(self, con: MeasureConverter, graph: calc.LazyGraph, outputs: Iterable[str]) -> None:
+        super().__init__(con)
+        self.__con = con
+        self.__graph = graph
+        self.__outputs = list(outputs)
+
+    @ins.stage
+    def calc(self, df: pd.DataFrame) -> pd.DataFrame:
+        def source(col: str):
+            if col in df:
+                return con.read_arrays(col, df)
+
+        con = self.__con
+        graph = self.__graph
+        outputs = self.__outputs
+
+        cols = graph.evaluate(source, len(df), outputs)
+
+        new_df = df
+        filled = np.zeros(len(df), dtype=bool)
+        for col in outputs:
+            lazy_col = cols[col]
+            new_df = con.write_arrays(col, lazy_col.val, lazy_col.err_min, lazy_col.err_max,
+                                      new_df, rows=lazy_col.filled)
+
+            filled |= lazy_col.filled
+
+        computed = int(filled.sum())
+        ins.count("computed", computed)
+        ins.count("passed", len(df) - computed)
+
+        return new_df
+
+
+class DFPlanetTeffLazyCalc(DFLazyCalculation):
+    def __init__(self, con: MeasureConverter, rou: err.Round) -> None:
+        graph = calc.LazyGraph(
+            [
+                calc.Derivation(
+                    "semi_major_axis",
+                    ms.SemiMajorAxis,
+                    calc.SemiMajorAxisCalc(),
+                    {
+                        "star_mass": ms.StarMass,
+                        "orbital_period": ms.OrbitalPeriod
+                    }
+                ),
+                calc.Derivation(
+                    "temp_calculated",
+                    ms.TempCalculated,
+                    calc.PlanetTeffCalc(),
+                    {
+                        "star_teff": ms.StarTeff,
+                        "star_radius": ms.StarRadius,
+                        "semi_major_axis": ms.SemiMajorAxis
+                    }
+                ),
+            ],
+            rou
+        )
+
+        super().__init__(con, graph, ["temp_calculated"])
@@ -1,4 +1,7 @@
 import numpy as np
+import instrumentation as ins
+import kernels
+import memo
 from abc import ABC, abstractmethod
 
 class ErrorGenerator(ABC):
@@ -6,6 +9,11 @@ class ErrorGenerator(ABC):
     def gen(self, val: float):
         pass
 
+    def gen_many(self, vals: np.ndarray) -> np.ndarray:
+        errs = np.array([self.gen(val) for val in vals.tolist()], dtype=np.float64)
+
+        return errs
+
 
 class ErrorGeneratorByOrder(ErrorGenerator):
     def __init__(self) -> None:
@@ -54,6 +62,9 @@ class ErrorGeneratorByOrder(ErrorGenerator):
 class ErrorGeneratorStarTeff(ErrorGenerator):
     def gen(self, val: float) -> float:
         return 100
+
+    def gen_many(self, vals: np.ndarray) -> np.ndarray:
+        return np.full(len(vals), 100.0)
     
 
 class Round:
@@ -95,6 +106,7 @@ class Round:
 
         return val_r
     
+    @ins.call
     def round_err(self, err: float) -> float:
         err_norm = self.__norm(err)
         if not err_norm:
@@ -110,10 +122,49 @@ class Round:
 
         return err_r
     
+    @ins.call
     def round_val(self, val: float, err: float) -> float:
         err_ord = self.__order(err)
         if not err_ord:
             return val
 
         val_r = self.__round(val, err_ord)
-        return val_r
\ No newline at end of file
+        return val_r
+
+    def round_errs(self, errs: np.ndarray) -> np.ndarray:
+        errs = np.asarray(errs, dtype=np.float64)
+
+        errs_r = kernels.round_errs(errs)
+        return errs_r
+
+    def round_vals(self, vals: np.ndarray, errs: np.ndarray) -> np.ndarray:
+        vals = np.asarray(vals, dtype=np.float64)
+        errs = np.asarray(errs, dtype=np.float64)
+
+        vals_r = kernels.round_vals(vals, errs)
+        return vals_r
+
+
+class MemoRound(Round):
+    def __init__(self, capacity: int = 4096, eviction="lru") -> None:
+        super().__init__()
+        self.__cache = memo.MemoCache(capacity, eviction)
+
+    def round_err(self, err: float) -> float:
+        cache = self.__cache
+
+        err_r = cache.get_or_calc(("err", memo.key_val(err)), lambda: super(MemoRound, self).round_err(err))
+        return err_r
+
+    def round_val(self, val: float, err: float) -> float:
+        cache = self.__cache
+
+        val_r = cache.get_or_calc(("val", memo.key_val(val), memo.key_val(err)), lambda: super(MemoRound, self).round_val(val, err))
+        return val_r
+
+    @property
+    def stats(self) -> memo.CacheStats:
+        return self.__cache.stats
+
+    def clear(self) -> None:
+        self.__cache.clear()
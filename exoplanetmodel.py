@@ -0,0 +1,275 @@
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+import pandas as pd
+import measures as ms
+import calculators as calc
+import errors as err
+import tables as tab
+import df_transformers as trans
+import instrumentation as ins
+from conversion import MeasureConverter
+from catalogue import CatalogueLoader
+from pipeline import AsyncPipeline
+from export import ColumnarExporter, FORMATS, PARTITIONS
+from typing import Callable, Iterable
+
+MAX_REL_ERR = 0.5
+MAX_PL_MASS_JUP = 14
+
+def file_fingerprint(path: str, *opts: object) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+
+    h.update(repr(opts).encode())
+
+    return h.hexdigest()
+
+
+class StageCache:
+    def __init__(self, cache_dir: str, fingerprint: str) -> None:
+        self.__cache_dir = cache_dir
+        self.__fingerprint = fingerprint
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def __path(self, stage: str, opts: tuple) -> str:
+        h = hashlib.sha1(self.__fingerprint.encode())
+        h.update(repr(opts).encode())
+
+        name = "{stage}-{fp}.pkl".format(stage=stage, fp=h.hexdigest())
+
+        return os.path.join(self.__cache_dir, name)
+
+    def get_or_run[T](self, stage: str, f: Callable[[], T], *opts: object) -> T:
+        if not self.__cache_dir:
+            return f()
+
+        path = self.__path(stage, opts)
+        if os.path.exists(path):
+            with open(path, "rb") as cf:
+                return pickle.load(cf)
+
+        val = f()
+        with open(path, "wb") as cf:
+            pickle.dump(val, cf)
+
+        return val
+
+
+def filter_planets(df: pd.DataFrame) -> pd.DataFrame:
+    p_only_comp = df.query("star_name.notna() and (orbital_period.notna() or semi_major_axis.notna())")
+    p_mass_rad = p_only_comp.query("mass.notna() and radius.notna()")
+
+    precise_q = "(mass_error_min + mass_error_max) / 2 < mass * {rel_err} and (radius_error_min + radius_error_max) / 2 < radius * {rel_err}".format(rel_err=MAX_REL_ERR)
+    p_precise = p_mass_rad.query(precise_q)
+
+    only_planets_q = "mass < {mass}".format(mass=MAX_PL_MASS_JUP)
+    p_only_planets = p_precise.query(only_planets_q)
+
+    return p_only_planets
+
+def clean_outliers(df: pd.DataFrame) -> pd.DataFrame:
+    import outlier_cleaners as oucl
+
+    mr_ouclean = oucl.MassRadiusOutlierCleaner(5, 10, tree_count=100, seed=122)
+    p_cl = mr_ouclean.clean(df, 0.1)
+
+    return p_cl
+
+def cluster(df: pd.DataFrame, n_clusters: int) -> list[pd.DataFrame]:
+    import clustering as cl
+
+    mr_clst = cl.MassRadiusClusterer(n_clusters, seed=0)
+
+    cl_dfs = mr_clst.learn(df)
+    cl_dfs = sorted(cl_dfs, key=lambda df: df["mass"].mean())
+
+    return cl_dfs
+
+def transform_chain() -> list[Callable[[pd.DataFrame], pd.DataFrame]]:
+    converter = MeasureConverter()
+    rou = err.Round()
+
+    err_gen_by_order = err.ErrorGeneratorByOrder()
+    err_gen_star_teff = err.ErrorGeneratorStarTeff()
+
+    steff_table = tab.SpClassTeffTable(tab.SP_CLASS_TABLE)
+
+    chain = [
+        trans.DFErrorGen(converter, err_gen_by_order, "orbital_period", ms.OrbitalPeriod).gen,
+        trans.DFErrorGen(converter, err_gen_by_order, "star_mass", ms.StarMass).gen,
+        trans.DFErrorGen(converter, err_gen_star_teff, "star_teff", ms.StarTeff).gen,
+        trans.DFErrorGen(converter, err_gen_by_order, "semi_major_axis", ms.SemiMajorAxis).gen,
+        trans.DFStarTeffBySpClassCalc(converter, steff_table).set_vals,
+        trans.DFSemiMajorAxisCalc(converter, calc.SemiMajorAxisCalc(), rou).calc,
+        trans.DFPlanetTeffMeanCalc(converter, calc.PlanetTeffCalc(), rou).calc,
+    ]
+
+    return chain
+
+def transform(cl_dfs: Iterable[pd.DataFrame], workers: int, chunk_size: int) -> list[pd.DataFrame]:
+    def chunks(df: pd.DataFrame) -> list[pd.DataFrame]:
+        if not chunk_size:
+            return [df]
+
+        return [df.iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size)]
+
+    cl_chunks = [chunks(df) for df in cl_dfs]
+    flat_chunks = [chunk for df_chunks in cl_chunks for chunk in df_chunks]
+
+    runner = AsyncPipeline(transform_chain(), workers=workers)
+    calc_chunks = iter(runner.run_clusters(flat_chunks))
+
+    calc_cl_dfs = [pd.concat([next(calc_chunks) for _ in df_chunks]) for df_chunks in cl_chunks]
+
+    return calc_cl_dfs
+
+def regressions(df: pd.DataFrame, giants_df: pd.DataFrame, it: int, search="grid",
+                checkpoint_dir: str = None) -> dict[str, object]:
+    import outlier_cleaners as oucl
+    import regression_models as model
+
+    def checkpoint(name: str) -> str:
+        if not checkpoint_dir:
+            return None
+
+        return os.path.join(checkpoint_dir, "{name}.jsonl".format(name=name))
+
+    mr_model = model.MassRadiusLogRegression(it=it, search=search, checkpoint=checkpoint("mass_radius"))
+    mr_model.learn(df)
+
+    tr_large_p = giants_df[["radius", "temp_calculated"]].query("temp_calculated.notna()")
+    tr_lp_cleaned = oucl.LargePTeffRadiusCleaner().clean(tr_large_p)
+
+    teff_r_reg = model.RadiusLogTeffRegression(it=it, alpha_int=(0, 100), eps=0.01,
+                                               checkpoint=checkpoint("radius_teff"))
+    teff_r_reg.learn(tr_lp_cleaned)
+
+    models = {
+        "mass_radius": mr_model,
+        "radius_teff": teff_r_reg,
+    }
+
+    return models
+
+def write_output(cl_dfs: Iterable[pd.DataFrame], out_dir: str, fmt: str, partition: str = None,
+                 float32_errors=False, chunk_size: int = None) -> list[str]:
+    with ColumnarExporter(out_dir, "exo_with_teff", fmt, partition, float32_errors) as exporter:
+        for cluster, df in enumerate(cl_dfs):
+            chunk_size_cl = chunk_size or max(len(df), 1)
+            chunks = (df.iloc[start:start + chunk_size_cl] for start in range(0, len(df), chunk_size_cl))
+
+            exporter.write_chunks(chunks, cluster)
+
+    return exporter.paths
+
+def print_summary(prof: ins.Profiler, file=sys.stderr) -> None:
+    print("{0:<16} {1:>10} {2:>10} {3:>10}".format("stage", "seconds", "rows in", "rows out"), file=file)
+
+    for r in prof.records:
+        if r["parent"] is not None:
+            continue
+
+        rows_in = "" if r["rows_in"] is None else r["rows_in"]
+        rows_out = "" if r["rows_out"] is None else r["rows_out"]
+        print("{0:<16} {1:>10.3f} {2:>10} {3:>10}".format(r["stage"], r["wall_s"], rows_in, rows_out), file=file)
+
+def print_search_summary(trace: pd.DataFrame, file=sys.stderr) -> None:
+    print("{0:<6} {1:>10} {2:>8} {3:>10}".format("rung", "candidates", "repeats", "best R2"), file=file)
+
+    for rung, rung_trace in trace.groupby("rung"):
+        print("{0:<6} {1:>10} {2:>8} {3:>10.4f}".format(rung, len(rung_trace), rung_trace["it"].max(),
+                                                         rung_trace["R2"].max()), file=file)
+
+def run(args: argparse.Namespace) -> int:
+    loader = CatalogueLoader(float32_errors=args.float32_errors)
+    fingerprint = file_fingerprint(args.input, args.float32_errors)
+    cache = StageCache(args.cache_dir, fingerprint)
+
+    with ins.Profiler() as prof:
+        with prof.stage("load") as r:
+            df = loader.load(args.input)
+            r["rows_out"] = len(df)
+
+        with prof.stage("filter", len(df)) as r:
+            p_df = filter_planets(df)
+            r["rows_out"] = len(p_df)
+
+        with prof.stage("clean", len(p_df)) as r:
+            p_cl = cache.get_or_run("clean", lambda: clean_outliers(p_df))
+            r["rows_out"] = len(p_cl)
+
+        with prof.stage("cluster", len(p_cl)) as r:
+            cl_dfs = cache.get_or_run("cluster", lambda: cluster(p_cl, args.clusters), args.clusters)
+            r["rows_out"] = sum(map(len, cl_dfs))
+
+        with prof.stage("transform", len(p_cl)) as r:
+            calc_cl_dfs = transform(cl_dfs, args.workers, args.chunk_size)
+            calc_df = pd.concat(calc_cl_dfs, ignore_index=True)
+            r["rows_out"] = len(calc_df)
+
+        if not args.skip_regressions:
+            with prof.stage("regress", len(calc_df)):
+                regress = lambda: regressions(p_cl, calc_cl_dfs[-1], args.it, args.search, args.checkpoint_dir)
+                models = cache.get_or_run("regress", regress, args.clusters, args.it, args.search, args.checkpoint_dir)
+
+        with prof.stage("write", len(calc_df)):
+            out_paths = write_output(calc_cl_dfs, args.output, args.format, args.partition,
+                                     args.float32_errors, args.chunk_size)
+
+    print_summary(prof)
+    for out_path in out_paths:
+        print("wrote {0}".format(out_path), file=sys.stderr)
+
+    if not args.skip_regressions:
+        for name, model in models.items():
+            print("{0} R2: {1:.2f}".format(name, model.R2), file=sys.stderr)
+
+        trace = models["mass_radius"].search_trace
+        print_search_summary(trace)
+
+        if args.checkpoint_dir:
+            trace_path = os.path.join(args.checkpoint_dir, "mass_radius_trace.csv")
+            trace.to_csv(trace_path, index=False)
+            print("wrote {0}".format(trace_path), file=sys.stderr)
+
+    if args.profile:
+        prof.to_jsonl(args.profile)
+
+    return 0
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="exoplanetmodel")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_p = commands.add_parser("run", help="run the full catalogue pipeline")
+    run_p.add_argument("input", help="catalogue CSV")
+    run_p.add_argument("-o", "--output", default=".", help="output directory")
+    run_p.add_argument("-f", "--format", default="csv", choices=list(FORMATS))
+    run_p.add_argument("--partition", default=None, choices=list(PARTITIONS), help="split output by cluster or host star")
+    run_p.add_argument("-j", "--workers", type=int, default=None)
+    run_p.add_argument("--chunk-size", type=int, default=None, help="rows per transformer task")
+    run_p.add_argument("--cache-dir", default=None)
+    run_p.add_argument("--clusters", type=int, default=2)
+    run_p.add_argument("--it", type=int, default=5, help="cross-validation repeats for the regressions")
+    run_p.add_argument("--search", default="grid", choices=["grid", "halving"],
+                       help="hyperparameter search for the mass-radius regression")
+    run_p.add_argument("--checkpoint-dir", default=None, help="persist regression search progress so it can resume")
+    run_p.add_argument("--float32-errors", action="store_true")
+    run_p.add_argument("--skip-regressions", action="store_true")
+    run_p.add_argument("--profile", default=None, help="write per-stage records as JSON lines")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
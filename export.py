@@ -0,0 +1,277 @@
+import os
+import zlib
+import numpy as np
+import pandas as pd
+from typing import Iterable
+from catalogue import STR_COLS, is_err_col
+
+FORMATS = {
+    "parquet": "parquet",
+    "npz": "npz",
+    "csv": "csv",
+    "csv.gz": "csv.gz",
+}
+
+PARTITIONS = {
+    "cluster": "cluster",
+    "star": "star_bucket",
+}
+
+def _pyarrow() -> object:
+    try:
+        import pyarrow
+        import pyarrow.parquet
+
+    except ImportError:
+        return None
+
+    return pyarrow
+
+def export_frame(df: pd.DataFrame, float32_errors=False) -> pd.DataFrame:
+    dtypes = {}
+    for col in df.columns:
+        if col in STR_COLS and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            dtypes[col] = "category"
+
+        elif float32_errors and is_err_col(col) and df[col].dtype != np.float32:
+            dtypes[col] = np.float32
+
+    if not dtypes:
+        return df
+
+    return df.astype(dtypes)
+
+def star_buckets(star_name: pd.Series, buckets: int) -> np.ndarray:
+    cat = pd.Categorical(star_name)
+
+    cat_buckets = np.array([zlib.crc32(str(name).encode()) % buckets for name in cat.categories], dtype=np.int64)
+    cat_buckets = np.append(cat_buckets, 0)
+
+    return cat_buckets[cat.codes]
+
+
+class _ParquetSink:
+    def __init__(self, path: str, compression: str) -> None:
+        self.__path = path
+        self.__compression = compression or "zstd"
+        self.__schema = None
+        self.__writer = None
+
+    def __table(self, df: pd.DataFrame) -> object:
+        pa = _pyarrow()
+
+        arrays = []
+        for col in df.columns:
+            series = df[col]
+
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes = series.array.codes.astype(np.int32)
+                indices = pa.array(codes, mask=codes < 0)
+                dictionary = pa.array(series.array.categories.astype(str).to_numpy(), type=pa.string())
+
+                arrays.append(pa.DictionaryArray.from_arrays(indices, dictionary))
+
+            else:
+                arrays.append(pa.array(series.to_numpy(), from_pandas=True))
+
+        if self.__schema is None:
+            self.__schema = pa.schema([pa.field(col, arr.type) for col, arr in zip(df.columns, arrays)])
+
+        return pa.Table.from_arrays(arrays, schema=self.__schema)
+
+    def write(self, df: pd.DataFrame) -> None:
+        pa = _pyarrow()
+
+        table = self.__table(df)
+        if self.__writer is None:
+            str_cols = [col for col in table.column_names if col in STR_COLS]
+            self.__writer = pa.parquet.ParquetWriter(self.__path, table.schema, compression=self.__compression,
+                                                     use_dictionary=str_cols)
+
+        self.__writer.write_table(table)
+
+    def close(self) -> None:
+        if self.__writer is not None:
+            self.__writer.close()
+
+
+class _NpzSink:
+    def __init__(self, path: str) -> None:
+        self.__path = path
+        self.__chunk = 0
+        self.__categories = {}
+
+    def __codes(self, col: str, series: pd.Series) -> tuple[np.ndarray, bool]:
+        categories = self.__categories
+        cat = series.array.remove_unused_categories()
+
+        known = categories.get(col, pd.Index([], dtype=object))
+        new_cats = cat.categories.difference(known, sort=False)
+        if len(new_cats):
+            known = known.append(new_cats)
+            categories[col] = known
+
+        cat_codes = np.append(known.get_indexer(cat.categories), -1).astype(np.int32)
+
+        return cat_codes[cat.codes], bool(len(new_cats))
+
+    def __write_categories(self) -> None:
+        arrays = {"{col}__categories".format(col=col): cats.astype(str).to_numpy(dtype=str)
+                  for col, cats in self.__categories.items()}
+
+        np.savez_compressed(os.path.join(self.__path, "categories.npz"), **arrays)
+
+    def write(self, df: pd.DataFrame) -> None:
+        arrays = {}
+        grown = False
+        for col in df.columns:
+            series = df[col]
+
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes, new_cats = self.__codes(col, series)
+                arrays["{col}__codes".format(col=col)] = codes
+                grown = grown or new_cats
+
+            else:
+                arrays[col] = series.to_numpy()
+
+        os.makedirs(self.__path, exist_ok=True)
+        path = os.path.join(self.__path, "part-{chunk:05d}.npz".format(chunk=self.__chunk))
+        np.savez_compressed(path, **arrays)
+
+        if grown or not self.__chunk:
+            self.__write_categories()
+
+        self.__chunk += 1
+
+    def close(self) -> None:
+        pass
+
+
+class _CsvSink:
+    def __init__(self, path: str, compression: str) -> None:
+        self.__path = path
+        self.__compression = compression
+        self.__first = True
+
+    def write(self, df: pd.DataFrame) -> None:
+        first = self.__first
+        mode = "w" if first else "a"
+
+        df.to_csv(self.__path, mode=mode, header=first, index=False, compression=self.__compression)
+
+        self.__first = False
+
+    def close(self) -> None:
+        pass
+
+
+class ColumnarExporter:
+    def __init__(self, out_dir: str, name: str, fmt="parquet", partition: str = None,
+                 float32_errors=False, compression: str = None, buckets=64) -> None:
+        if fmt not in FORMATS:
+            raise ValueError("fmt argument can only has either {fmts} values, not \"{fmt}\"".format(
+                fmts=", ".join("\"{0}\"".format(f) for f in FORMATS), fmt=fmt))
+
+        if partition is not None and partition not in PARTITIONS:
+            raise ValueError("partition argument can only has either \"cluster\" or \"star\" values, not \"{partition}\"".format(partition=partition))
+
+        if fmt == "parquet" and _pyarrow() is None:
+            fmt = "npz"
+
+        os.makedirs(out_dir, exist_ok=True)
+
+        self.__out_dir = out_dir
+        self.__name = name
+        self.__fmt = fmt
+        self.__partition = partition
+        self.__float32_errors = float32_errors
+        self.__compression = compression
+        self.__buckets = buckets
+        self.__sinks = {}
+
+    def __path(self, key: int) -> str:
+        out_dir = self.__out_dir
+        name = self.__name
+        ext = FORMATS[self.__fmt]
+
+        if self.__partition is None:
+            if self.__fmt == "npz":
+                return os.path.join(out_dir, name)
+
+            return os.path.join(out_dir, "{name}.{ext}".format(name=name, ext=ext))
+
+        part_dir = os.path.join(out_dir, name, "{col}={key}".format(col=PARTITIONS[self.__partition], key=key))
+        if self.__fmt == "npz":
+            return part_dir
+
+        os.makedirs(part_dir, exist_ok=True)
+
+        return os.path.join(part_dir, "part.{ext}".format(ext=ext))
+
+    def __sink(self, key: int) -> object:
+        sinks = self.__sinks
+
+        if key not in sinks:
+            fmt = self.__fmt
+            path = self.__path(key)
+
+            if fmt == "parquet":
+                sinks[key] = _ParquetSink(path, self.__compression)
+
+            elif fmt == "npz":
+                sinks[key] = _NpzSink(path)
+
+            else:
+                compression = self.__compression or ("gzip" if fmt == "csv.gz" else None)
+                sinks[key] = _CsvSink(path, compression)
+
+        return sinks[key]
+
+    @property
+    def fmt(self) -> str:
+        return self.__fmt
+
+    @property
+    def paths(self) -> list[str]:
+        return [self.__path(key) for key in self.__sinks]
+
+    def write(self, df: pd.DataFrame, cluster: int = None) -> None:
+        partition = self.__partition
+        fmt = self.__fmt
+
+        new_df = df
+        if fmt in ("parquet", "npz"):
+            new_df = export_frame(df, self.__float32_errors)
+
+        if partition is None:
+            self.__sink(None).write(new_df)
+
+        elif partition == "cluster":
+            if cluster is None:
+                raise ValueError("cluster argument is required when partitioning by cluster")
+
+            self.__sink(cluster).write(new_df)
+
+        else:
+            bucket = star_buckets(df["star_name"], self.__buckets)
+
+            order = np.argsort(bucket, kind="stable")
+            keys, starts = np.unique(bucket[order], return_index=True)
+
+            for key, idx in zip(keys.tolist(), np.split(order, starts[1:])):
+                self.__sink(key).write(new_df.iloc[idx])
+
+    def write_chunks(self, chunks: Iterable[pd.DataFrame], cluster: int = None) -> None:
+        for chunk in chunks:
+            self.write(chunk, cluster)
+
+    def close(self) -> None:
+        for sink in self.__sinks.values():
+            sink.close()
+
+    def __enter__(self) -> "ColumnarExporter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,232 @@
+import functools
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable
+
+_active = None
+
+def enabled() -> bool:
+    return _active is not None
+
+def count(key: str, n=1) -> None:
+    prof = _active
+    if prof is not None:
+        prof._count(key, n)
+
+def stage(fn: Callable) -> Callable:
+    @functools.wraps(fn)
+    def wrapper(self, df, *args, **kwargs):
+        prof = _active
+        if prof is None:
+            return fn(self, df, *args, **kwargs)
+
+        name = "{cl}.{fn}".format(cl=type(self).__name__, fn=fn.__name__)
+        if prof.current == name:
+            name = "{cl}({fn})".format(cl=type(self).__name__, fn=fn.__qualname__)
+
+        with prof.stage(name, len(df)) as record:
+            result = fn(self, df, *args, **kwargs)
+            record["rows_out"] = len(result)
+
+        return result
+
+    return wrapper
+
+def call(fn: Callable) -> Callable:
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        prof = _active
+        if prof is None:
+            return fn(self, *args, **kwargs)
+
+        name = "{cl}.{fn}".format(cl=type(self).__name__, fn=fn.__name__)
+        start = time.perf_counter()
+        try:
+            return fn(self, *args, **kwargs)
+
+        finally:
+            prof._call(name, time.perf_counter() - start)
+
+    return wrapper
+
+
+class Profiler:
+    def __init__(self, trace_memory=False) -> None:
+        self.__trace_memory = trace_memory
+        self.__records = []
+        self.__stack = []
+        self.__calls = {}
+        self.__next_id = 0
+        self.__prev = None
+        self.__tm_started = False
+
+    def __enter__(self) -> "Profiler":
+        global _active
+
+        self.__prev = _active
+        _active = self
+
+        if self.__trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__tm_started = True
+
+        return self
+
+    def __exit__(self, *exc) -> None:
+        global _active
+
+        _active = self.__prev
+
+        if self.__tm_started:
+            tracemalloc.stop()
+            self.__tm_started = False
+
+    def __new_record(self, name: str, rows_in: int) -> dict:
+        stack = self.__stack
+        parent = stack[-1]["id"] if stack else None
+
+        record_id = self.__next_id
+        self.__next_id += 1
+
+        record = {
+            "id": record_id,
+            "parent": parent,
+            "stage": name,
+            "wall_s": 0.0,
+            "rows_in": rows_in,
+            "rows_out": None,
+            "computed": 0,
+            "passed": 0,
+            "copies": 0,
+            "peak_mem": None,
+            "calls": {},
+        }
+
+        return record
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int = None):
+        stack = self.__stack
+        trace_memory = self.__trace_memory and tracemalloc.is_tracing()
+
+        record = self.__new_record(name, rows_in)
+
+        if trace_memory:
+            if stack:
+                outer = stack[-1]
+                outer["_peak"] = max(outer["_peak"], tracemalloc.get_traced_memory()[1])
+
+            tracemalloc.reset_peak()
+            record["_mem_start"] = record["_peak"] = tracemalloc.get_traced_memory()[0]
+
+        stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+
+        finally:
+            record["wall_s"] = time.perf_counter() - start
+            stack.pop()
+
+            if trace_memory:
+                peak = max(record.pop("_peak"), tracemalloc.get_traced_memory()[1])
+                record["peak_mem"] = peak - record.pop("_mem_start")
+
+                if stack:
+                    stack[-1]["_peak"] = max(stack[-1]["_peak"], peak)
+
+            self.__records.append(record)
+
+    def _count(self, key: str, n: int) -> None:
+        stack = self.__stack
+        if stack:
+            stack[-1][key] += n
+
+    def _call(self, name: str, wall_s: float) -> None:
+        stack = self.__stack
+        calls = stack[-1]["calls"] if stack else self.__calls
+
+        call_stat = calls.setdefault(name, [0, 0.0])
+        call_stat[0] += 1
+        call_stat[1] += wall_s
+
+    @property
+    def current(self) -> str:
+        stack = self.__stack
+        if stack:
+            return stack[-1]["stage"]
+
+    @property
+    def records(self) -> list[dict]:
+        return sorted(self.__records, key=lambda r: r["id"])
+
+    @property
+    def calls(self) -> dict[str, list]:
+        return self.__calls
+
+    def summary(self) -> list[dict]:
+        stages = {}
+        for r in self.records:
+            s = stages.setdefault(r["stage"], {
+                "stage": r["stage"], "runs": 0, "wall_s": 0.0, "rows_in": 0, "rows_out": 0,
+                "computed": 0, "passed": 0, "copies": 0, "peak_mem": None, "calls": {}
+            })
+
+            s["runs"] += 1
+            s["wall_s"] += r["wall_s"]
+            s["rows_in"] += r["rows_in"] or 0
+            s["rows_out"] += r["rows_out"] or 0
+            s["computed"] += r["computed"]
+            s["passed"] += r["passed"]
+            s["copies"] += r["copies"]
+
+            if r["peak_mem"] is not None:
+                s["peak_mem"] = max(s["peak_mem"] or 0, r["peak_mem"])
+
+            for name, (calls, wall_s) in r["calls"].items():
+                call_stat = s["calls"].setdefault(name, [0, 0.0])
+                call_stat[0] += calls
+                call_stat[1] += wall_s
+
+        return list(stages.values())
+
+    def to_jsonl(self, path: str) -> None:
+        with open(path, "w") as f:
+            for r in self.records:
+                f.write(json.dumps(r))
+                f.write("\n")
+
+    def to_prometheus(self, path: str, prefix="exoplanetmodel") -> None:
+        def metric(name: str, labels: dict[str, str], val: float) -> str:
+            lab = ",".join("{0}=\"{1}\"".format(k, v) for k, v in labels.items())
+            return "{prefix}_{name}{{{lab}}} {val}\n".format(prefix=prefix, name=name, lab=lab, val=val)
+
+        counters = {
+            "runs": "stage_runs_total",
+            "wall_s": "stage_seconds_total",
+            "rows_in": "stage_rows_in_total",
+            "rows_out": "stage_rows_out_total",
+            "computed": "stage_rows_computed_total",
+            "passed": "stage_rows_passed_total",
+            "copies": "stage_frame_copies_total",
+        }
+
+        lines = []
+        for s in self.summary():
+            labels = {"stage": s["stage"]}
+
+            for counter, counter_name in counters.items():
+                lines.append(metric(counter_name, labels, s[counter]))
+
+            if s["peak_mem"] is not None:
+                lines.append(metric("stage_peak_mem_bytes", labels, s["peak_mem"]))
+
+            for name, (calls, wall_s) in s["calls"].items():
+                call_labels = {"stage": s["stage"], "call": name}
+                lines.append(metric("calls_total", call_labels, calls))
+                lines.append(metric("call_seconds_total", call_labels, wall_s))
+
+        with open(path, "w") as f:
+            f.writelines(lines)
@@ -0,0 +1,378 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+BACKENDS = ("numba", "numpy")
+
+TTYPES = {
+    "mean": 0,
+    "min": 1,
+    "max": 2,
+}
+
+_backend = None
+_jitted = {}
+
+def _load_numba() -> object:
+    try:
+        import numba
+
+    except ImportError:
+        return None
+
+    return numba
+
+def set_backend(name="auto") -> None:
+    global _backend
+
+    if name == "auto":
+        name = "numba" if _load_numba() is not None else "numpy"
+
+    elif name not in BACKENDS:
+        raise ValueError("name argument can only has either \"auto\", \"numba\" or \"numpy\" values, not \"{name}\"".format(name=name))
+
+    elif name == "numba" and _load_numba() is None:
+        raise ImportError("numba backend requested but numba is not installed")
+
+    _backend = name
+
+def backend() -> str:
+    if _backend is None:
+        set_backend()
+
+    return _backend
+
+def _jit(fn: Callable) -> Callable:
+    if fn not in _jitted:
+        numba = _load_numba()
+        _jitted[fn] = numba.njit(nogil=True, cache=True, error_model="numpy")(fn)
+
+    return _jitted[fn]
+
+def ttype_code(ttype: str) -> int:
+    try:
+        return TTYPES[ttype]
+
+    except KeyError:
+        raise ValueError("ttype argument can only has either \"min\", \"mean\", \"max\" values, not \"{ttype}\"".format(ttype=ttype)) from None
+
+def run_threaded(kernel: Callable, arrays: list[np.ndarray], *args, chunk_size=1 << 16,
+                 workers: int = None) -> tuple[np.ndarray, ...]:
+    n = len(arrays[0])
+    if n <= chunk_size:
+        return kernel(*arrays, *args)
+
+    def run(start: int) -> tuple[np.ndarray, ...]:
+        stop = start + chunk_size
+        return kernel(*[arr[start:stop] for arr in arrays], *args)
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        parts = list(ex.map(run, range(0, n, chunk_size)))
+
+    if isinstance(parts[0], tuple):
+        return tuple(np.concatenate(outs) for outs in zip(*parts))
+
+    return np.concatenate(parts, axis=-1)
+
+
+def _planet_teff_loop(star_t, star_t_emin, star_t_emax, star_r, star_r_emin, star_r_emax,
+                      sm_axis, sm_axis_emin, sm_axis_emax, ecc, ecc_emin, ecc_emax,
+                      alb, alb_remin, alb_remax, star_r_k, ttype):
+    n = len(star_t)
+    val = np.empty(n)
+    err_min = np.empty(n)
+    err_max = np.empty(n)
+
+    for i in range(n):
+        sm_axis_remin = sm_axis_emin[i] / sm_axis[i]
+        sm_axis_remax = sm_axis_emax[i] / sm_axis[i]
+
+        if ttype == 1:
+            dist = sm_axis[i] * (1 - ecc[i])
+            dist_remin = sm_axis_remin + ecc_emin[i] / (1 - ecc[i])
+            dist_remax = sm_axis_remax + ecc_emax[i] / (1 - ecc[i])
+
+        elif ttype == 2:
+            dist = sm_axis[i] * (1 + ecc[i])
+            dist_remin = sm_axis_remin + ecc_emin[i] / (1 + ecc[i])
+            dist_remax = sm_axis_remax + ecc_emax[i] / (1 + ecc[i])
+
+        else:
+            dist = sm_axis[i]
+            dist_remin = sm_axis_remin
+            dist_remax = sm_axis_remax
+
+        teff = star_t[i] * np.sqrt(star_r[i] * star_r_k / (2 * dist)) * (1 - alb[i]) ** 0.25
+
+        teff_remin = star_t_emin[i] / star_t[i] + (star_r_emin[i] / star_r[i] + dist_remin) / 2 + alb_remin[i] / 4
+        teff_remax = star_t_emax[i] / star_t[i] + (star_r_emax[i] / star_r[i] + dist_remax) / 2 + alb_remax[i] / 4
+
+        val[i] = teff
+        err_min[i] = teff * teff_remin
+        err_max[i] = teff * teff_remax
+
+    return val, err_min, err_max
+
+def _planet_teff_np(star_t, star_t_emin, star_t_emax, star_r, star_r_emin, star_r_emax,
+                    sm_axis, sm_axis_emin, sm_axis_emax, ecc, ecc_emin, ecc_emax,
+                    alb, alb_remin, alb_remax, star_r_k, ttype):
+    sm_axis_remin = sm_axis_emin / sm_axis
+    sm_axis_remax = sm_axis_emax / sm_axis
+
+    if ttype == 1:
+        dist = sm_axis * (1 - ecc)
+        dist_remin = sm_axis_remin + ecc_emin / (1 - ecc)
+        dist_remax = sm_axis_remax + ecc_emax / (1 - ecc)
+
+    elif ttype == 2:
+        dist = sm_axis * (1 + ecc)
+        dist_remin = sm_axis_remin + ecc_emin / (1 + ecc)
+        dist_remax = sm_axis_remax + ecc_emax / (1 + ecc)
+
+    else:
+        dist = sm_axis
+        dist_remin = sm_axis_remin
+        dist_remax = sm_axis_remax
+
+    val = star_t * np.sqrt(star_r * star_r_k / (2 * dist)) * np.power(1 - alb, 1 / 4)
+
+    teff_remin = star_t_emin / star_t + (star_r_emin / star_r + dist_remin) / 2 + alb_remin / 4
+    teff_remax = star_t_emax / star_t + (star_r_emax / star_r + dist_remax) / 2 + alb_remax / 4
+
+    return val, val * teff_remin, val * teff_remax
+
+def planet_teff(star_t, star_t_emin, star_t_emax, star_r, star_r_emin, star_r_emax,
+                sm_axis, sm_axis_emin, sm_axis_emax, ecc, ecc_emin, ecc_emax,
+                alb, alb_remin, alb_remax, star_r_k: float, ttype: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    kernel = _jit(_planet_teff_loop) if backend() == "numba" else _planet_teff_np
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return kernel(star_t, star_t_emin, star_t_emax, star_r, star_r_emin, star_r_emax,
+                      sm_axis, sm_axis_emin, sm_axis_emax, ecc, ecc_emin, ecc_emax,
+                      alb, alb_remin, alb_remax, star_r_k, ttype)
+
+
+def _planet_teff_range_loop(star_t, star_t_emin, star_t_emax, star_r, star_r_emin, star_r_emax,
+                            sm_axis, sm_axis_emin, sm_axis_emax, ecc, ecc_emin, ecc_emax,
+                            alb, alb_remin, alb_remax, star_r_k):
+    n = len(star_t)
+    out = np.empty((9, n))
+
+    for i in range(n):
+        star_rk = star_r[i] * star_r_k
+        alb_k = (1 - alb[i]) ** 0.25
+
+        sm_axis_remin = sm_axis_emin[i] / sm_axis[i]
+        sm_axis_remax = sm_axis_emax[i] / sm_axis[i]
+
+        star_t_remin = star_t_emin[i] / star_t[i]
+        star_t_remax = star_t_emax[i] / star_t[i]
+        alb_qmin = alb_remin[i] / 4
+        alb_qmax = alb_remax[i] / 4
+        star_r_remin = star_r_emin[i] / star_r[i]
+        star_r_remax = star_r_emax[i] / star_r[i]
+
+        peri = 1 - ecc[i]
+        apo = 1 + ecc[i]
+
+        dists = (sm_axis[i] * peri, sm_axis[i], sm_axis[i] * apo)
+        dist_remins = (sm_axis_remin + ecc_emin[i] / peri, sm_axis_remin, sm_axis_remin + ecc_emin[i] / apo)
+        dist_remaxs = (sm_axis_remax + ecc_emax[i] / peri, sm_axis_remax, sm_axis_remax + ecc_emax[i] / apo)
+
+        for j in range(3):
+            teff = star_t[i] * np.sqrt(star_rk / (2 * dists[j])) * alb_k
+
+            out[3 * j, i] = teff
+            out[3 * j + 1, i] = teff * (star_t_remin + (star_r_remin + dist_remins[j]) / 2 + alb_qmin)
+            out[3 * j + 2, i] = teff * (star_t_remax + (star_r_remax + dist_remaxs[j]) / 2 + alb_qmax)
+
+    return out
+
+def _planet_teff_range_np(star_t, star_t_emin, star_t_emax, star_r, star_r_emin, star_r_emax,
+                          sm_axis, sm_axis_emin, sm_axis_emax, ecc, ecc_emin, ecc_emax,
+                          alb, alb_remin, alb_remax, star_r_k):
+    n = len(star_t)
+    out = np.empty((9, n))
+
+    star_rk = star_r * star_r_k
+    alb_k = np.power(1 - alb, 1 / 4)
+
+    sm_axis_remin = sm_axis_emin / sm_axis
+    sm_axis_remax = sm_axis_emax / sm_axis
+
+    star_t_remin = star_t_emin / star_t
+    star_t_remax = star_t_emax / star_t
+    alb_qmin = alb_remin / 4
+    alb_qmax = alb_remax / 4
+    star_r_remin = star_r_emin / star_r
+    star_r_remax = star_r_emax / star_r
+
+    peri = 1 - ecc
+    apo = 1 + ecc
+
+    dists = (sm_axis * peri, sm_axis, sm_axis * apo)
+    dist_remins = (sm_axis_remin + ecc_emin / peri, sm_axis_remin, sm_axis_remin + ecc_emin / apo)
+    dist_remaxs = (sm_axis_remax + ecc_emax / peri, sm_axis_remax, sm_axis_remax + ecc_emax / apo)
+
+    for j in range(3):
+        teff = star_t * np.sqrt(star_rk / (2 * dists[j])) * alb_k
+
+        out[3 * j] = teff
+        out[3 * j + 1] = teff * (star_t_remin + (star_r_remin + dist_remins[j]) / 2 + alb_qmin)
+        out[3 * j + 2] = teff * (star_t_remax + (star_r_remax + dist_remaxs[j]) / 2 + alb_qmax)
+
+    return out
+
+def planet_teff_range(star_t, star_t_emin, star_t_emax, star_r, star_r_emin, star_r_emax,
+                      sm_axis, sm_axis_emin, sm_axis_emax, ecc, ecc_emin, ecc_emax,
+                      alb, alb_remin, alb_remax, star_r_k: float) -> np.ndarray:
+    kernel = _jit(_planet_teff_range_loop) if backend() == "numba" else _planet_teff_range_np
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return kernel(star_t, star_t_emin, star_t_emax, star_r, star_r_emin, star_r_emax,
+                      sm_axis, sm_axis_emin, sm_axis_emax, ecc, ecc_emin, ecc_emax,
+                      alb, alb_remin, alb_remax, star_r_k)
+
+
+def _round_errs_loop(errs):
+    n = len(errs)
+    errs_r = np.empty(n)
+
+    for i in range(n):
+        e = errs[i]
+        abs_e = abs(e)
+        if not abs_e > 0:
+            errs_r[i] = e
+            continue
+
+        order = np.trunc(np.log10(abs_e))
+        if abs_e < 1:
+            order -= 1
+
+        norm = e * 10.0 ** -order
+        scale = 1.0 if np.trunc(norm) > 2 else 10.0
+
+        errs_r[i] = np.rint(norm * scale) / scale * 10.0 ** order
+
+    return errs_r
+
+def _round_vals_loop(vals, errs):
+    n = len(vals)
+    vals_r = np.empty(n)
+
+    for i in range(n):
+        abs_e = abs(errs[i])
+        if not abs_e > 0:
+            vals_r[i] = vals[i]
+            continue
+
+        err_order = np.trunc(np.log10(abs_e))
+        if abs_e < 1:
+            err_order -= 1
+
+        if err_order == 0:
+            vals_r[i] = vals[i]
+            continue
+
+        v = vals[i]
+        abs_v = abs(v)
+        if not abs_v > 0:
+            vals_r[i] = np.nan
+            continue
+
+        order = np.trunc(np.log10(abs_v))
+        if abs_v < 1:
+            order -= 1
+
+        scale = 10.0 ** abs(err_order)
+        vals_r[i] = np.rint(v * 10.0 ** -order * scale) / scale * 10.0 ** order
+
+    return vals_r
+
+def _orders(vals: np.ndarray) -> np.ndarray:
+    abs_vals = np.abs(vals)
+
+    orders = np.trunc(np.log10(abs_vals))
+    orders = np.where(abs_vals < 1, orders - 1, orders)
+    orders = np.where(abs_vals > 0, orders, np.nan)
+
+    return orders
+
+def _rounds(vals: np.ndarray, digits: np.ndarray) -> np.ndarray:
+    val_orders = _orders(vals)
+
+    norm = vals * 10.0 ** -val_orders
+    digits_scale = 10.0 ** digits
+    norm_r = np.round(norm * digits_scale) / digits_scale
+
+    vals_r = norm_r * 10.0 ** val_orders
+    return vals_r
+
+def _round_errs_np(errs):
+    err_orders = _orders(errs)
+    err_norms = errs * 10.0 ** -err_orders
+
+    digits = np.where(np.trunc(err_norms) > 2, 0, 1)
+    errs_r = _rounds(errs, digits)
+
+    errs_r = np.where(np.isnan(err_orders), errs, errs_r)
+    return errs_r
+
+def _round_vals_np(vals, errs):
+    err_orders = _orders(errs)
+    keep = np.isnan(err_orders) | (err_orders == 0)
+
+    digits = np.abs(np.where(keep, 0, err_orders))
+    vals_r = _rounds(vals, digits)
+
+    vals_r = np.where(keep, vals, vals_r)
+    return vals_r
+
+def round_errs(errs: np.ndarray) -> np.ndarray:
+    kernel = _jit(_round_errs_loop) if backend() == "numba" else _round_errs_np
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return kernel(errs)
+
+def round_vals(vals: np.ndarray, errs: np.ndarray) -> np.ndarray:
+    kernel = _jit(_round_vals_loop) if backend() == "numba" else _round_vals_np
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return kernel(vals, errs)
+
+
+def _star_reduce_loop(codes, vals, err_mins, err_maxs, n_groups):
+    counts = np.zeros(n_groups)
+    sums = np.zeros(n_groups)
+    sq_mins = np.zeros(n_groups)
+    sq_maxs = np.zeros(n_groups)
+
+    for i in range(len(codes)):
+        g = codes[i]
+        counts[g] += 1
+        sums[g] += vals[i]
+        sq_mins[g] += err_mins[i] ** 2
+        sq_maxs[g] += err_maxs[i] ** 2
+
+    for g in range(n_groups):
+        sums[g] = sums[g] / counts[g]
+        sq_mins[g] = np.sqrt(sq_mins[g]) / counts[g]
+        sq_maxs[g] = np.sqrt(sq_maxs[g]) / counts[g]
+
+    return sums, sq_mins, sq_maxs
+
+def _star_reduce_np(codes, vals, err_mins, err_maxs, n_groups):
+    counts = np.bincount(codes, minlength=n_groups)
+
+    val = np.bincount(codes, weights=vals, minlength=n_groups) / counts
+    err_min = np.sqrt(np.bincount(codes, weights=err_mins ** 2, minlength=n_groups)) / counts
+    err_max = np.sqrt(np.bincount(codes, weights=err_maxs ** 2, minlength=n_groups)) / counts
+
+    return val, err_min, err_max
+
+def star_reduce(codes: np.ndarray, vals: np.ndarray, err_mins: np.ndarray, err_maxs: np.ndarray,
+                n_groups: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    kernel = _jit(_star_reduce_loop) if backend() == "numba" else _star_reduce_np
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return kernel(codes, vals, err_mins, err_maxs, n_groups)
@@ -0,0 +1,24 @@
+import importlib
+
+class LazyModule:
+    def __init__(self, name: str) -> None:
+        self.__name = name
+        self.__module = None
+
+    def __load(self) -> object:
+        module = self.__module
+        if module is None:
+            module = importlib.import_module(self.__name)
+            self.__module = module
+
+        return module
+
+    def __getattr__(self, attr: str) -> object:
+        module = self.__load()
+
+        return getattr(module, attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__module is not None else "not loaded"
+
+        return "<lazy module '{name}' ({state})>".format(name=self.__name, state=state)
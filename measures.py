@@ -1,6 +1,9 @@
 from abc import ABC
+from units import SOL_MASS_KG, SOL_RAD_M, AU_M, JUP_MASS_KG, JUP_RAD_M, DAY_S
 
 class Measure(ABC):
+    __slots__ = ("__val", "__err_min", "__err_max", "__err")
+
     def __init__(self, val: float, err_min: float, err_max: float) -> None:
         self.__val = val
         self.__err_min = err_min
@@ -9,237 +12,167 @@ class Measure(ABC):
     @property
     def val(self)  -> float:
         return self.__val
-    
+
     @property
     def err_min(self) -> float:
         return self.__err_min
-    
+
     @property
     def err_max(self) -> float:
         return self.__err_max
-    
+
     @property
     def err(self) -> float:
-        err = (self.err_min + self.err_max) / 2
+        try:
+            return self.__err
+
+        except AttributeError:
+            err = (self.__err_min + self.__err_max) / 2
+            self.__err = err
+
+            return err
 
-        return err
-    
     @property
     def rerr_min(self) -> float:
-        rerr = self.err_min / self.val
+        rerr = self.__err_min / self.__val
 
         return rerr
-    
+
     @property
     def rerr_max(self) -> float:
-        rerr_max = self.err_max / self.val
+        rerr_max = self.__err_max / self.__val
 
         return rerr_max
-    
+
     @property
     def rerr(self) -> float:
-        rerr = self.err / self.val
+        rerr = self.err / self.__val
 
         return rerr
-    
+
     def __str__(self) -> str:
         s = "{val} +/- {err}".format(val=self.val, err=self.err)
 
         return s
-    
-
-SOL_MASS_KG = 1.989e+30
 
-class StarMass(Measure):
-    def __init__(self, val: float, err_min: float, err_max: float) -> None:
-        super().__init__(val, err_min, err_max)
 
-    @staticmethod
-    def __to_kg(x: float) -> float:
-        x_kg = x * SOL_MASS_KG
+class _KgMeasure(Measure):
+    __slots__ = ()
 
-        return x_kg
+    TO_KG = 1.0
 
     @property
     def val_kg(self) -> float:
-        return __class__.__to_kg(self.val)
+        return self.val * self.TO_KG
 
     @property
     def err_min_kg(self) -> float:
-        return __class__.__to_kg(self.err_min)
+        return self.err_min * self.TO_KG
 
     @property
     def err_max_kg(self) -> float:
-        return __class__.__to_kg(self.err_max)
-    
+        return self.err_max * self.TO_KG
+
     @property
     def err_kg(self) -> float:
-        return __class__.__to_kg(self.err)
+        return self.err * self.TO_KG
 
 
-SOL_RAD_M =  6.957e+8
+class _MMeasure(Measure):
+    __slots__ = ()
 
-class StarRadius(Measure):
-    def __init__(self, val: float, err_min: float, err_max: float) -> None:
-        super().__init__(val, err_min, err_max)
-
-    @staticmethod
-    def __to_m(x: float) -> float:
-        x_kg = x * SOL_RAD_M
-
-        return x_kg
+    TO_M = 1.0
 
     @property
     def val_m(self) -> float:
-        return __class__.__to_m(self.val)
+        return self.val * self.TO_M
 
     @property
     def err_min_m(self) -> float:
-        return __class__.__to_m(self.err_min)
+        return self.err_min * self.TO_M
 
     @property
     def err_max_m(self) -> float:
-        return __class__.__to_m(self.err_max)
-    
+        return self.err_max * self.TO_M
+
     @property
     def err_m(self) -> float:
-        return __class__.__to_m(self.err)
-    
+        return self.err * self.TO_M
 
-AU_M = 1.496e+11
 
-class SemiMajorAxis(Measure):
-    def __init__(self, val: float, err_min: float, err_max: float) -> None:
-        super().__init__(val, err_min, err_max)
-
-    @staticmethod
-    def __to_m(x: float) -> float:
-        x_kg = x * AU_M
+class _SMeasure(Measure):
+    __slots__ = ()
 
-        return x_kg
+    TO_S = 1.0
 
     @property
-    def val_m(self) -> float:
-        return __class__.__to_m(self.val)
+    def val_s(self) -> float:
+        return self.val * self.TO_S
 
     @property
-    def err_min_m(self) -> float:
-        return __class__.__to_m(self.err_min)
+    def err_min_s(self) -> float:
+        return self.err_min * self.TO_S
 
     @property
-    def err_max_m(self) -> float:
-        return __class__.__to_m(self.err_max)
-    
+    def err_max_s(self) -> float:
+        return self.err_max * self.TO_S
+
     @property
-    def err_m(self) -> float:
-        return __class__.__to_m(self.err)
+    def err_s(self) -> float:
+        return self.err * self.TO_S
 
 
-class Eccentricity(Measure):
-    def __init__(self, val: float, err_min: float, err_max: float) -> None:
-        super().__init__(val, err_min, err_max)
+class StarMass(_KgMeasure):
+    __slots__ = ()
 
+    TO_KG = SOL_MASS_KG
 
-JUP_MASS_KG = 1.898e+27
 
-class Mass(Measure):
-    def __init__(self, val: float, err_min: float, err_max: float) -> None:
-        super().__init__(val, err_min, err_max)
+class StarRadius(_MMeasure):
+    __slots__ = ()
 
-    @staticmethod
-    def __to_kg(x: float) -> float:
-        x_kg = x * JUP_MASS_KG
+    TO_M = SOL_RAD_M
 
-        return x_kg
 
-    @property
-    def val_kg(self) -> float:
-        return __class__.__to_kg(self.val)
+class SemiMajorAxis(_MMeasure):
+    __slots__ = ()
 
-    @property
-    def err_min_kg(self) -> float:
-        return __class__.__to_kg(self.err_min)
-
-    @property
-    def err_max_kg(self) -> float:
-        return __class__.__to_kg(self.err_max)
-    
-    @property
-    def err_kg(self) -> float:
-        return __class__.__to_kg(self.err)
-    
+    TO_M = AU_M
 
-JUP_RAD_M = 6.9911e+7
 
-class Radius(Measure):
-    def __init__(self, val: float, err_min: float, err_max: float) -> None:
-        super().__init__(val, err_min, err_max)
+class Eccentricity(Measure):
+    __slots__ = ()
 
-    @staticmethod
-    def __to_m(x: float) -> float:
-        x_kg = x * JUP_RAD_M
 
-        return x_kg
+class Mass(_KgMeasure):
+    __slots__ = ()
 
-    @property
-    def val_m(self) -> float:
-        return __class__.__to_m(self.val)
+    TO_KG = JUP_MASS_KG
 
-    @property
-    def err_min_m(self) -> float:
-        return __class__.__to_m(self.err_min)
-
-    @property
-    def err_max_m(self) -> float:
-        return __class__.__to_m(self.err_max)
-    
-    @property
-    def err_m(self) -> float:
-        return __class__.__to_m(self.err)
-    
 
-class OrbitalPeriod(Measure):
-    def __init__(self, val: float, err_min: float, err_max: float) -> None:
-        super().__init__(val, err_min, err_max)
+class Radius(_MMeasure):
+    __slots__ = ()
 
-    @staticmethod
-    def __to_s(x):
-        x_s = x * 24 * 60 * 60
+    TO_M = JUP_RAD_M
 
-        return x_s
 
-    @property
-    def val_s(self):
-        return __class__.__to_s(self.val)
-    
-    @property
-    def err_min_s(self) -> float:
-        return __class__.__to_s(self.err_min)
+class OrbitalPeriod(_SMeasure):
+    __slots__ = ()
 
-    @property
-    def err_max_s(self) -> float:
-        return __class__.__to_s(self.err_max)
-    
-    @property
-    def err_s(self) -> float:
-        return __class__.__to_s(self.err)
+    TO_S = DAY_S
 
 
 class TempCalculated(Measure):
-    def __init__(self, val: float, err_min: float, err_max: float) -> None:
-        super().__init__(val, err_min, err_max)
+    __slots__ = ()
 
 
 class StarDistance(Measure):
-    def __init__(self, val: float, err_min: float, err_max: float) -> None:
-        super().__init__(val, err_min, err_max)
+    __slots__ = ()
 
 
 class StarMetalicity(Measure):
-    def __init__(self, val: float, err_min: float, err_max: float) -> None:
-        super().__init__(val, err_min, err_max)
+    __slots__ = ()
 
 
 class StarTeff(Measure):
-    def __init__(self, val: float, err_min: float, err_max: float) -> None:
-        super().__init__(val, err_min, err_max)
\ No newline at end of file
+    __slots__ = ()
@@ -0,0 +1,73 @@
+from collections import OrderedDict, namedtuple
+from typing import Callable, Hashable
+
+def key_val(val: object) -> object:
+    if val != val:
+        return None
+
+    return val
+
+
+class CacheStats(namedtuple("CacheStats", ["hits", "misses", "evictions", "size", "capacity"])):
+    __slots__ = ()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        if not lookups:
+            return 0.0
+
+        return self.hits / lookups
+
+
+class MemoCache[T]:
+    def __init__(self, capacity: int = 4096, eviction="lru") -> None:
+        if eviction not in ("lru", "fifo"):
+            raise ValueError("eviction argument can only has either \"lru\" or \"fifo\" values, not \"{eviction}\"".format(eviction=eviction))
+
+        self.__capacity = capacity
+        self.__lru = eviction == "lru"
+        self.__items = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def get_or_calc(self, key: Hashable, f: Callable[[], T]) -> T:
+        items = self.__items
+
+        try:
+            val = items[key]
+
+        except KeyError:
+            pass
+
+        else:
+            self.__hits += 1
+            if self.__lru:
+                items.move_to_end(key)
+
+            return val
+
+        self.__misses += 1
+
+        val = f()
+        items[key] = val
+
+        capacity = self.__capacity
+        if capacity is not None and len(items) > capacity:
+            items.popitem(last=False)
+            self.__evictions += 1
+
+        return val
+
+    def clear(self) -> None:
+        self.__items.clear()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        stats = CacheStats(self.__hits, self.__misses, self.__evictions, len(self.__items), self.__capacity)
+
+        return stats
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+from typing import Iterable
+from catalogue import COLS, MEASURE_COLS, VAL_COLS, STR_COLS, CatalogueLoader, err_min_col, err_max_col
+
+def normalise_names(names: Iterable[str]) -> np.ndarray:
+    names = pd.Series(names, dtype=object)
+
+    norm = names.str.casefold().str.replace(r"[\s_\-]+", "", regex=True)
+
+    return norm.to_numpy(dtype=object)
+
+
+class AliasIndex:
+    def __init__(self, aliases: Iterable[Iterable[str]] = ()) -> None:
+        self.__keys = {}
+        self.__size = 0
+
+        for names in aliases:
+            self.add(names)
+
+    def __new_key(self) -> int:
+        key = self.__size
+        self.__size += 1
+
+        return key
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def add(self, names: Iterable[str]) -> int:
+        keys = self.__keys
+        norms = normalise_names(list(names))
+
+        known = [keys[norm] for norm in norms if norm in keys]
+        key = known[0] if known else self.__new_key()
+
+        for norm in norms:
+            keys.setdefault(norm, key)
+
+        return key
+
+    def keys(self, names: pd.Series) -> np.ndarray:
+        keys = self.__keys
+
+        codes, uniques = pd.factorize(names)
+        norms = pd.Series(normalise_names(uniques), dtype=object)
+
+        uniq_keys = norms.map(keys).to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+
+        new = np.isnan(uniq_keys) & norms.notna().to_numpy()
+        new_codes, new_norms = pd.factorize(norms[new])
+        uniq_keys[new] = self.__size + new_codes
+
+        keys.update(zip(new_norms, range(self.__size, self.__size + len(new_norms))))
+        self.__size += len(new_norms)
+
+        name_keys = np.append(uniq_keys, np.nan)[codes]
+
+        no_key = np.isnan(name_keys)
+        name_keys[no_key] = self.__size + np.arange(no_key.sum())
+        self.__size += int(no_key.sum())
+
+        return name_keys.astype(np.int64)
+
+
+def _best_rows(order: np.ndarray, groups: np.ndarray, starts: np.ndarray, valid: np.ndarray,
+               score: np.ndarray, n_keys: int) -> np.ndarray:
+    valid = valid[order]
+    score = np.where(valid, score[order], np.inf)
+
+    best = np.minimum.reduceat(score, starts)
+    hit = np.flatnonzero(valid & (score == best[groups]))
+
+    hit_groups = groups[hit]
+    first = np.empty(len(hit), dtype=bool)
+    first[:1] = True
+    first[1:] = hit_groups[1:] != hit_groups[:-1]
+
+    rows = np.full(n_keys, -1)
+    rows[hit_groups[first]] = order[hit[first]]
+
+    return rows
+
+def _take(arr: np.ndarray, rows: np.ndarray, fill: object) -> np.ndarray:
+    taken = arr[rows]
+    taken[rows < 0] = fill
+
+    return taken
+
+def merge_catalogues(dfs: Iterable[pd.DataFrame], aliases: AliasIndex = None) -> pd.DataFrame:
+    aliases = aliases or AliasIndex()
+
+    df = pd.concat([df.reindex(columns=COLS) for df in dfs], ignore_index=True)
+
+    name_keys = aliases.keys(df["name"])
+    uniq_keys, first_rows, inv = np.unique(name_keys, return_index=True, return_inverse=True)
+
+    appearance = np.argsort(first_rows, kind="stable")
+    rank = np.empty(len(appearance), dtype=np.int64)
+    rank[appearance] = np.arange(len(appearance))
+
+    keys = rank[inv]
+    n_keys = len(uniq_keys)
+    row_order = np.arange(len(df))
+
+    order = np.argsort(keys, kind="stable")
+    groups = keys[order]
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+
+    merged = {}
+    for name in MEASURE_COLS:
+        cols = (name, err_min_col(name), err_max_col(name))
+        vals, err_mins, err_maxs = (df[col].to_numpy(dtype=np.float64, na_value=np.nan) for col in cols)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rerr = np.abs((err_mins + err_maxs) / 2 / vals)
+
+        rerr[np.isnan(rerr)] = np.inf
+
+        rows = _best_rows(order, groups, starts, ~np.isnan(vals), rerr, n_keys)
+        for col, arr in zip(cols, (vals, err_mins, err_maxs)):
+            merged[col] = _take(arr, rows, np.nan)
+
+    for col in VAL_COLS:
+        vals = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        rows = _best_rows(order, groups, starts, ~np.isnan(vals), row_order, n_keys)
+        merged[col] = _take(vals, rows, np.nan)
+
+    for col in STR_COLS:
+        vals = df[col].to_numpy(dtype=object)
+
+        rows = _best_rows(order, groups, starts, df[col].notna().to_numpy(), row_order, n_keys)
+        merged[col] = _take(vals, rows, None)
+
+    merged_df = pd.DataFrame(merged)[COLS]
+    merged_df = merged_df.astype(CatalogueLoader().dtypes)
+
+    return merged_df
@@ -1,11 +1,13 @@
-import sklearn.tree as tree
-import sklearn.ensemble as ens
-import sklearn.preprocessing as pre
-import sklearn.cluster as clu
 import numpy as np
 import pandas as pd
 from typing import Iterable, Callable
 import consts as c
+from lazy import LazyModule
+
+tree = LazyModule("sklearn.tree")
+ens = LazyModule("sklearn.ensemble")
+pre = LazyModule("sklearn.preprocessing")
+clu = LazyModule("sklearn.cluster")
 
 class MassRadiusOutlierCleaner:
     def __init__(self, depth: int, min_leaf: int, tree_count=1, seed=None) -> None:
@@ -0,0 +1,171 @@
+import asyncio
+import pandas as pd
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Iterable, Iterator
+from catalogue import CatalogueLoader
+from store import CatalogueStore, open_frame
+
+_DONE = object()
+
+def apply_chain(chain: Iterable[Callable[[pd.DataFrame], pd.DataFrame]], df: pd.DataFrame) -> pd.DataFrame:
+    new_df = df
+    for step in chain:
+        new_df = step(new_df)
+
+    return new_df
+
+def apply_chain_view(chain: Iterable[Callable[[pd.DataFrame], pd.DataFrame]], path: str,
+                     cols: list[str], rows: slice) -> pd.DataFrame:
+    df = open_frame(path, cols, rows)
+
+    return apply_chain(chain, df)
+
+def _next_chunk(chunks: Iterator[pd.DataFrame]) -> object:
+    return next(chunks, _DONE)
+
+def _write_chunk(path: str, df: pd.DataFrame, first: bool, compression: str) -> None:
+    mode = "w" if first else "a"
+    df.to_csv(path, mode=mode, header=first, index=False, compression=compression)
+
+
+class AsyncPipeline:
+    def __init__(self, chain: Iterable[Callable[[pd.DataFrame], pd.DataFrame]],
+                 executor: Executor = None, workers: int = None, queue_size=4) -> None:
+        self.__chain = list(chain)
+        self.__executor = executor
+        self.__workers = workers
+        self.__queue_size = queue_size
+
+    def __get_executor(self) -> tuple[Executor, bool]:
+        if self.__executor is not None:
+            return self.__executor, False
+
+        return ProcessPoolExecutor(max_workers=self.__workers), True
+
+    async def __read(self, chunks: Iterator[pd.DataFrame], out_q: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            chunk = await loop.run_in_executor(None, _next_chunk, chunks)
+            if chunk is _DONE:
+                break
+
+            await out_q.put(chunk)
+
+        await out_q.put(_DONE)
+
+    async def __transform(self, executor: Executor, in_q: asyncio.Queue, out_q: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        chain = self.__chain
+
+        pending = asyncio.Queue(self.__queue_size)
+
+        async def submit():
+            while True:
+                chunk = await in_q.get()
+                if chunk is _DONE:
+                    await pending.put(_DONE)
+                    break
+
+                fut = loop.run_in_executor(executor, apply_chain, chain, chunk)
+                await pending.put(fut)
+
+        async def collect():
+            while True:
+                fut = await pending.get()
+                if fut is _DONE:
+                    await out_q.put(_DONE)
+                    break
+
+                await out_q.put(await fut)
+
+        await asyncio.gather(submit(), collect())
+
+    async def __write(self, in_q: asyncio.Queue, path: str, compression: str) -> int:
+        loop = asyncio.get_running_loop()
+
+        rows = 0
+        first = True
+        while True:
+            chunk = await in_q.get()
+            if chunk is _DONE:
+                break
+
+            await loop.run_in_executor(None, _write_chunk, path, chunk, first, compression)
+            rows += len(chunk)
+            first = False
+
+        return rows
+
+    async def run_chunks(self, chunks: Iterable[pd.DataFrame], out_path: str, compression="gzip") -> int:
+        queue_size = self.__queue_size
+        executor, own = self.__get_executor()
+
+        read_q = asyncio.Queue(queue_size)
+        write_q = asyncio.Queue(queue_size)
+
+        try:
+            _, _, rows = await asyncio.gather(
+                self.__read(iter(chunks), read_q),
+                self.__transform(executor, read_q, write_q),
+                self.__write(write_q, out_path, compression)
+            )
+
+        finally:
+            if own:
+                executor.shutdown()
+
+        return rows
+
+    async def run_file(self, in_path: str, out_path: str, chunk_size: int,
+                       loader: CatalogueLoader = None, compression="gzip") -> int:
+        loader = loader or CatalogueLoader()
+
+        chunks = loader.iter_chunks(in_path, chunk_size)
+        rows = await self.run_chunks(chunks, out_path, compression)
+
+        return rows
+
+    async def run_frames(self, dfs: Iterable[pd.DataFrame]) -> list[pd.DataFrame]:
+        loop = asyncio.get_running_loop()
+        chain = self.__chain
+        executor, own = self.__get_executor()
+
+        try:
+            futs = [loop.run_in_executor(executor, partial(apply_chain, chain, df)) for df in dfs]
+            new_dfs = await asyncio.gather(*futs)
+
+        finally:
+            if own:
+                executor.shutdown()
+
+        return list(new_dfs)
+
+    async def run_view(self, store: CatalogueStore, chunk_size: int, cols: list[str] = None) -> list[pd.DataFrame]:
+        loop = asyncio.get_running_loop()
+        chain = self.__chain
+        executor, own = self.__get_executor()
+
+        chunk_size = chunk_size or store.rows
+        slices = [slice(start, start + chunk_size) for start in range(0, store.rows, chunk_size)]
+
+        try:
+            futs = [loop.run_in_executor(executor, partial(apply_chain_view, chain, store.path, cols, rows)) for rows in slices]
+            new_dfs = await asyncio.gather(*futs)
+
+        finally:
+            if own:
+                executor.shutdown()
+
+        return list(new_dfs)
+
+    def run(self, in_path: str, out_path: str, chunk_size: int,
+            loader: CatalogueLoader = None, compression="gzip") -> int:
+        return asyncio.run(self.run_file(in_path, out_path, chunk_size, loader, compression))
+
+    def run_clusters(self, cl_dfs: Iterable[pd.DataFrame]) -> list[pd.DataFrame]:
+        return asyncio.run(self.run_frames(cl_dfs))
+
+    def run_store(self, store: CatalogueStore, chunk_size: int, cols: list[str] = None) -> list[pd.DataFrame]:
+        return asyncio.run(self.run_view(store, chunk_size, cols))
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import units as u
+from concurrent.futures import ProcessPoolExecutor
+from catalogue import COLS, CatalogueLoader
+from regression_models import Regression
+from store import CatalogueStore
+
+GEN_COLS = [
+    "mass",
+    "radius",
+    "temp_calculated",
+]
+
+_gen_model = None
+
+def _init_gen(model: "PopulationModel") -> None:
+    global _gen_model
+    _gen_model = model
+
+def _gen_chunk(path: str, start: int, rows: int, seed: np.random.SeedSequence) -> int:
+    model = _gen_model
+    rng = np.random.default_rng(seed)
+
+    store = CatalogueStore(path, mode="r+")
+    data = model.sample(rows, rng)
+
+    fill = {col: np.full(rows, np.nan) for col in store.columns
+            if col not in data and store.array(col).dtype.kind == "f"}
+    store.write_rows(start, {**data, **fill})
+
+    return rows
+
+
+class PopulationModel:
+    def __init__(self, means: np.ndarray, covariances: np.ndarray, weights: np.ndarray,
+                 mr_reg: Regression, rt_reg: Regression) -> None:
+        means = np.asarray(means)
+        covariances = np.asarray(covariances)
+        weights = np.asarray(weights)
+
+        self.__mass_log_mean = means[:, 0]
+        self.__mass_log_std = np.sqrt(covariances[:, 0, 0])
+        self.__weights = weights / weights.sum()
+        self.__mr_reg = mr_reg
+        self.__rt_reg = rt_reg
+
+    def sample(self, n: int, rng: np.random.Generator) -> dict[str, np.ndarray]:
+        mr_reg = self.__mr_reg
+        rt_reg = self.__rt_reg
+
+        cllab = rng.choice(len(self.__weights), size=n, p=self.__weights)
+        mass_log = rng.normal(self.__mass_log_mean[cllab], self.__mass_log_std[cllab])
+
+        radius_log = np.asarray(mr_reg.calc(mass=mass_log))
+        radius_log += rng.normal(0.0, mr_reg.resid_std, n)
+
+        teff = np.asarray(rt_reg.calc(radius=radius_log))
+        teff += rng.normal(0.0, rt_reg.resid_std, n)
+
+        data = {
+            "mass": u.convert(10 ** mass_log, "earth_mass", "jup_mass"),
+            "radius": u.convert(10 ** radius_log, "earth_radius", "jup_radius"),
+            "temp_calculated": teff,
+        }
+
+        return data
+
+
+class PopulationGenerator:
+    def __init__(self, model: PopulationModel, chunk_size=1_000_000, workers: int = None, seed=None) -> None:
+        self.__model = model
+        self.__chunk_size = chunk_size
+        self.__workers = workers
+        self.__seed = seed
+
+    def __chunks(self, n: int) -> tuple[list[int], list[int], list[np.random.SeedSequence]]:
+        chunk_size = self.__chunk_size
+
+        starts = list(range(0, n, chunk_size))
+        rows = [min(chunk_size, n - start) for start in starts]
+        seeds = np.random.SeedSequence(self.__seed).spawn(len(starts))
+
+        return starts, rows, seeds
+
+    def sample(self, n: int) -> pd.DataFrame:
+        model = self.__model
+
+        chunks = []
+        for _, rows, seed in zip(*self.__chunks(n)):
+            chunks.append(pd.DataFrame(model.sample(rows, np.random.default_rng(seed))))
+
+        df = pd.concat(chunks, ignore_index=True)
+
+        return df
+
+    def write(self, path: str, n: int, cols: list[str] = COLS) -> CatalogueStore:
+        dtypes = CatalogueLoader(cols).dtypes
+        store = CatalogueStore.create(path, n, dtypes)
+
+        starts, rows, seeds = self.__chunks(n)
+        paths = [path] * len(starts)
+
+        with ProcessPoolExecutor(max_workers=self.__workers, initializer=_init_gen, initargs=(self.__model,)) as ex:
+            list(ex.map(_gen_chunk, paths, starts, rows, seeds))
+
+        return CatalogueStore(store.path)
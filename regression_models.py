@@ -1,14 +1,19 @@
+import os
 from abc import ABC, abstractmethod
-from typing import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable
 import pandas as pd
 import numpy as np
-import sklearn.pipeline as pp
-import sklearn.linear_model as lin
-import sklearn.preprocessing as pre
-import sklearn.ensemble as ens
-from sklearn.model_selection import cross_validate, train_test_split, RepeatedKFold
 import consts as c
 from itertools import product
+from lazy import LazyModule
+from checkpoint import SearchCheckpoint, data_fingerprint
+
+pp = LazyModule("sklearn.pipeline")
+lin = LazyModule("sklearn.linear_model")
+pre = LazyModule("sklearn.preprocessing")
+msel = LazyModule("sklearn.model_selection")
+tpc = LazyModule("threadpoolctl")
 
 class NotLearnedError(Exception):
     def __init__(self, *args: object) -> None:
@@ -43,60 +48,270 @@ class Regression(ABC):
     
         return val
     
+    @abstractmethod
+    def _update(self, df: pd.DataFrame) -> None:
+        pass
+
+    def update(self, df: pd.DataFrame) -> None:
+        learned = self.__learned
+
+        if not learned:
+            cl_name = type(self).__name__
+            raise NotLearnedError("{0} is not learned".format(cl_name))
+
+        self._update(df)
+
     @property
     def R2(self) -> float:
         return 0.0
 
+    @property
+    def fit_R2(self) -> float:
+        return 0.0
+
+    @property
+    def resid_std(self) -> float:
+        return 0.0
+
+
+class RidgeStats:
+    def __init__(self, feats: np.ndarray, y: Iterable[float]) -> None:
+        feats_n = feats.shape[1]
+
+        self.__n = 0
+        self.__mean_f = np.zeros(feats_n)
+        self.__mean_y = 0.0
+        self.__c_ff = np.zeros((feats_n, feats_n))
+        self.__c_fy = np.zeros(feats_n)
+        self.__c_yy = 0.0
+        self.__fit_R2 = 0.0
+        self.__resid_std = 0.0
+
+        self.add(feats, y)
+
+    def add(self, feats: np.ndarray, y: Iterable[float]) -> None:
+        y = np.asarray(y, dtype=float)
+
+        n_b = len(y)
+        if not n_b:
+            return
+
+        mean_fb = feats.mean(axis=0)
+        mean_yb = float(y.mean())
+        feats_c = feats - mean_fb
+        y_c = y - mean_yb
+
+        n_a = self.__n
+        n = n_a + n_b
+        scale = n_a * n_b / n
+
+        delta_f = mean_fb - self.__mean_f
+        delta_y = mean_yb - self.__mean_y
+
+        self.__c_ff += feats_c.T @ feats_c + scale * np.outer(delta_f, delta_f)
+        self.__c_fy += feats_c.T @ y_c + scale * delta_f * delta_y
+        self.__c_yy += float(y_c @ y_c) + scale * delta_y ** 2
+
+        self.__mean_f += delta_f * n_b / n
+        self.__mean_y += delta_y * n_b / n
+        self.__n = n
+
+    def solve(self, ridge: "lin.Ridge") -> None:
+        c_ff = self.__c_ff
+        c_fy = self.__c_fy
+        c_yy = self.__c_yy
+
+        coef = np.linalg.solve(c_ff + ridge.alpha * np.eye(len(c_fy)), c_fy)
+
+        ridge.coef_ = coef
+        ridge.intercept_ = self.__mean_y - float(self.__mean_f @ coef)
+
+        sse = max(c_yy - 2 * float(coef @ c_fy) + float(coef @ c_ff @ coef), 0.0)
+
+        self.__fit_R2 = 1 - sse / c_yy if c_yy > 0 else 0.0
+        self.__resid_std = float(np.sqrt(sse / self.__n))
+
+    @property
+    def n(self) -> int:
+        return self.__n
+
+    @property
+    def fit_R2(self) -> float:
+        return self.__fit_R2
+
+    @property
+    def resid_std(self) -> float:
+        return self.__resid_std
+
+
+def refit_due(updates: int, refit_every: int, resid: np.ndarray, resid_std: float, drift_tol: float) -> bool:
+    if refit_every and updates >= refit_every:
+        return True
+
+    if drift_tol is None or not len(resid):
+        return False
+
+    return float(np.sqrt(np.mean(np.square(resid)))) > drift_tol * resid_std
+
 
 class MassRadiusLogRegression(Regression):
-    def __init__(self, it=10) -> None:
+    COLS = ["mass", "radius"]
+
+    def __init__(self, it=10, refit_every: int = None, drift_tol: float = None, n_jobs=4,
+                 search="grid", eta=3, min_it=1, tol: float = None, checkpoint: str = None) -> None:
+        if search not in ("grid", "halving"):
+            raise ValueError("search argument can only has either \"grid\" or \"halving\" values, not \"{search}\"".format(search=search))
+
         super().__init__()
         self.__reg = None
         self.__R2 = 0.0
+        self.__fit_R2 = 0.0
+        self.__resid_std = 0.0
         self.__iter = it
+        self.__n_jobs = n_jobs
+        self.__search = search
+        self.__eta = eta
+        self.__min_it = min_it
+        self.__tol = tol
+        self.__checkpoint = checkpoint
+        self.__trace = []
+        self.__refit_every = refit_every
+        self.__drift_tol = drift_tol
+        self.__stats = None
+        self.__dfs = []
+        self.__updates = 0
+
+    @staticmethod
+    def __xy(df: pd.DataFrame) -> tuple[np.ndarray, list[float]]:
+        mass_logX = np.array(c.mass_log(df)).reshape(-1, 1)
+        radius_log = c.radius_log(df)
 
-    def _learn(self, df: pd.DataFrame) -> None:
-        def cv_reg(
-                x: Iterable[float], 
-                y: Iterable[float], 
-                knots: int,
-                degree: int,
-                alpha: float,
-                it: int) -> tuple[lin.Ridge, float]:
-            reg = pp.make_pipeline(pre.SplineTransformer(n_knots=knots, degree=degree), lin.Ridge(alpha=alpha))
-            cv = RepeatedKFold(n_splits=10, n_repeats=it)
-            
-            valid = cross_validate(reg, x, y, cv=cv, n_jobs=4)
+        return mass_logX, radius_log
 
-            r2 = np.mean(valid["test_score"])
-            
-            return reg, r2
-        
+    @staticmethod
+    def __make_reg(knots: int, degree: int, alpha: float) -> "pp.Pipeline":
+        return pp.make_pipeline(pre.SplineTransformer(n_knots=knots, degree=degree), lin.Ridge(alpha=alpha))
+
+    def __cv_scores(self, x: np.ndarray, y: Iterable[float], params: tuple[int, int, float], start: int, it: int,
+                    ckpt: SearchCheckpoint) -> np.ndarray:
+        def cv_scores() -> np.ndarray:
+            reg = self.__make_reg(*params)
+            cv = msel.RepeatedKFold(n_splits=10, n_repeats=it)
+
+            valid = msel.cross_validate(reg, x, y, cv=cv, n_jobs=self.__n_jobs)
+
+            return valid["test_score"]
+
+        return ckpt.get_or_run([*params, start, it], cv_scores)
+
+    def __trace_row(self, rung: int, params: tuple[int, int, float], it: int, r2: float) -> None:
+        knots, degree, alpha = params
+
+        self.__trace.append({"rung": rung, "knots": knots, "degree": degree, "alpha": alpha, "it": it, "R2": r2})
+
+    def __grid_search(self, x: np.ndarray, y: Iterable[float], param_combs: list[tuple[int, int, float]],
+                      ckpt: SearchCheckpoint) -> tuple[tuple[int, int, float], float]:
         it = self.__iter
 
-        mass_log = c.mass_log(df)
-        radius_log = c.radius_log(df)
+        r2s = {}
+        for params in param_combs:
+            r2s[params] = float(np.mean(self.__cv_scores(x, y, params, 0, it, ckpt)))
+            self.__trace_row(0, params, it, r2s[params])
+
+        best = max(r2s, key=r2s.get)
+
+        return best, r2s[best]
+
+    def __halving_search(self, x: np.ndarray, y: Iterable[float], param_combs: list[tuple[int, int, float]],
+                         ckpt: SearchCheckpoint) -> tuple[tuple[int, int, float], float]:
+        it = self.__iter
+        eta = self.__eta
+        tol = self.__tol
+
+        scores = {params: np.empty(0) for params in param_combs}
+        done = {params: 0 for params in param_combs}
+        r2s = {}
+
+        cands = list(param_combs)
+        rung_it = min(self.__min_it, it)
+        rung = 0
+        while True:
+            for params in cands:
+                extra = rung_it - done[params]
+                if extra > 0:
+                    extra_scores = self.__cv_scores(x, y, params, done[params], extra, ckpt)
+                    scores[params] = np.append(scores[params], extra_scores)
+                    done[params] = rung_it
 
-        mass_logX = np.array(mass_log).reshape(-1, 1)
+                r2s[params] = float(np.mean(scores[params]))
+                self.__trace_row(rung, params, rung_it, r2s[params])
+
+            if len(cands) == 1 or rung_it >= it:
+                break
+
+            cands = sorted(cands, key=r2s.get, reverse=True)[:max(1, -(-len(cands) // eta))]
+            if tol is not None:
+                best_r2 = r2s[cands[0]]
+                cands = [params for params in cands if r2s[params] >= best_r2 - tol]
+
+            rung_it = min(rung_it * eta, it)
+            rung += 1
+
+        best = max(cands, key=r2s.get)
+
+        return best, r2s[best]
+
+    def _learn(self, df: pd.DataFrame) -> None:
+        mass_logX, radius_log = self.__xy(df)
 
         knots_vals = [3, 4, 5]
         degree_vals = [1, 2, 3, 4]
         alpha_vals = [0.05, 0.5, 1, 2, 10, 100]
 
-        param_combs = product(knots_vals, degree_vals, alpha_vals)
+        param_combs = list(product(knots_vals, degree_vals, alpha_vals))
 
-        reg_ts = []
-        for knots, degree, alpha in param_combs:
-            reg_t = cv_reg(mass_logX, radius_log, knots, degree, alpha, it)
+        space = {"knots": knots_vals, "degree": degree_vals, "alpha": alpha_vals, "n_splits": 10}
+        ckpt = SearchCheckpoint(self.__checkpoint, data_fingerprint(mass_logX, radius_log), space)
 
-            reg_ts.append(reg_t)
+        self.__trace = []
+        if self.__search == "halving":
+            best, r2 = self.__halving_search(mass_logX, radius_log, param_combs, ckpt)
 
-        reg_t_best = max(reg_ts, key=lambda t: t[1])
-        self.__reg = reg_t_best[0]
-        self.__R2 = reg_t_best[1]
+        else:
+            best, r2 = self.__grid_search(mass_logX, radius_log, param_combs, ckpt)
+
+        self.__reg = self.__make_reg(*best)
+        self.__R2 = r2
 
         self.__reg.fit(mass_logX, radius_log)
-        
+
+        resid = np.subtract(radius_log, self.__reg.predict(mass_logX))
+        self.__resid_std = float(np.std(resid))
+        self.__fit_R2 = float(1 - np.var(resid) / np.var(radius_log))
+
+        self.__stats = RidgeStats(self.__reg[:-1].transform(mass_logX), radius_log)
+        self.__dfs = [df[self.COLS]]
+        self.__updates = 0
+
+    def _update(self, df: pd.DataFrame) -> None:
+        reg = self.__reg
+        stats = self.__stats
+
+        mass_logX, radius_log = self.__xy(df)
+        resid = np.subtract(radius_log, reg.predict(mass_logX))
+
+        self.__dfs.append(df[self.COLS])
+        self.__updates += 1
+
+        if refit_due(self.__updates, self.__refit_every, resid, self.__resid_std, self.__drift_tol):
+            self._learn(pd.concat(self.__dfs, ignore_index=True))
+            return
+
+        stats.add(reg[:-1].transform(mass_logX), radius_log)
+        stats.solve(reg[-1])
+
+        self.__fit_R2 = stats.fit_R2
+        self.__resid_std = stats.resid_std
 
     def _calc(self, *args, **kwargs) -> Iterable[float]:
         reg = self.__reg
@@ -112,15 +327,46 @@ class MassRadiusLogRegression(Regression):
     def R2(self) -> float:
         return self.__R2
 
+    @property
+    def fit_R2(self) -> float:
+        return self.__fit_R2
+
+    @property
+    def resid_std(self) -> float:
+        return self.__resid_std
+
+    @property
+    def search_trace(self) -> pd.DataFrame:
+        return pd.DataFrame(self.__trace, columns=["rung", "knots", "degree", "alpha", "it", "R2"])
+
 
 class RadiusLogTeffRegression(Regression):
-    def __init__(self, it=10, alpha_int=(0.0, 1.0), eps=0.01) -> None:
+    COLS = ["radius", "temp_calculated"]
+
+    def __init__(self, it=10, alpha_int=(0.0, 1.0), eps=0.01, refit_every: int = None, drift_tol: float = None,
+                 n_jobs=4, checkpoint: str = None) -> None:
         super().__init__()
         self.__reg = None
         self.__R2 = 0.0
+        self.__fit_R2 = 0.0
+        self.__resid_std = 0.0
         self.__iter = it
+        self.__n_jobs = n_jobs
         self.__alphint = alpha_int
         self.__eps = eps
+        self.__checkpoint = checkpoint
+        self.__refit_every = refit_every
+        self.__drift_tol = drift_tol
+        self.__stats = None
+        self.__dfs = []
+        self.__updates = 0
+
+    @staticmethod
+    def __xy(df: pd.DataFrame) -> tuple[np.ndarray, list[float]]:
+        radius_log_X = np.reshape(c.radius_log(df), (-1, 1))
+        teff = df["temp_calculated"].to_list()
+
+        return radius_log_X, teff
 
     def _learn(self, df: pd.DataFrame) -> None:
         def int_len(inter: tuple[float, float]) -> float:
@@ -134,23 +380,28 @@ class RadiusLogTeffRegression(Regression):
                 y: Iterable[float], 
                 alpha: float,
                 it: int) -> tuple[lin.Ridge, float]:
+            def cv_scores() -> np.ndarray:
+                cv = msel.RepeatedKFold(n_splits=10, n_repeats=it)
+
+                valid = msel.cross_validate(reg, x, y, cv=cv, n_jobs=n_jobs)
+
+                return valid["test_score"]
+
             reg = lin.Ridge(alpha=alpha)
-            cv = RepeatedKFold(n_splits=10, n_repeats=it)
-            
-            valid = cross_validate(reg, x, y, cv=cv, n_jobs=4)
 
-            r2 = np.mean(valid["test_score"])
+            r2 = np.mean(ckpt.get_or_run([alpha, it], cv_scores))
             
             return reg, r2
             
         alpha_int = self.__alphint
         eps = self.__eps
         it = self.__iter
+        n_jobs = self.__n_jobs
 
-        radius_log = c.radius_log(df)
-        teff = df["temp_calculated"].to_list()
+        radius_log_X, teff = self.__xy(df)
 
-        radius_log_X = np.reshape(radius_log, (-1, 1))
+        space = {"alpha_int": list(alpha_int), "eps": eps, "n_splits": 10}
+        ckpt = SearchCheckpoint(self.__checkpoint, data_fingerprint(radius_log_X, teff), space)
 
         aint_cur = alpha_int
         while int_len(aint_cur) > eps:
@@ -178,7 +429,34 @@ class RadiusLogTeffRegression(Regression):
                 self.__R2 = comp_r2_r
 
         self.__reg.fit(radius_log_X, teff)
-        
+
+        resid = np.subtract(teff, self.__reg.predict(radius_log_X))
+        self.__resid_std = float(np.std(resid))
+        self.__fit_R2 = float(1 - np.var(resid) / np.var(teff))
+
+        self.__stats = RidgeStats(radius_log_X, teff)
+        self.__dfs = [df[self.COLS]]
+        self.__updates = 0
+
+    def _update(self, df: pd.DataFrame) -> None:
+        reg = self.__reg
+        stats = self.__stats
+
+        radius_log_X, teff = self.__xy(df)
+        resid = np.subtract(teff, reg.predict(radius_log_X))
+
+        self.__dfs.append(df[self.COLS])
+        self.__updates += 1
+
+        if refit_due(self.__updates, self.__refit_every, resid, self.__resid_std, self.__drift_tol):
+            self._learn(pd.concat(self.__dfs, ignore_index=True))
+            return
+
+        stats.add(radius_log_X, teff)
+        stats.solve(reg)
+
+        self.__fit_R2 = stats.fit_R2
+        self.__resid_std = stats.resid_std
 
     def _calc(self, *args, **kwargs) -> Iterable[float]:
         reg = self.__reg
@@ -192,4 +470,70 @@ class RadiusLogTeffRegression(Regression):
     
     @property
     def R2(self) -> float:
-        return self.__R2
\ No newline at end of file
+        return self.__R2
+
+    @property
+    def fit_R2(self) -> float:
+        return self.__fit_R2
+
+    @property
+    def resid_std(self) -> float:
+        return self.__resid_std
+
+def _learn_cluster(make: Callable[..., Regression], df: pd.DataFrame, n_jobs: int) -> Regression:
+    reg = make(n_jobs=n_jobs)
+
+    with tpc.threadpool_limits(limits=n_jobs):
+        reg.learn(df)
+
+    return reg
+
+
+class RegressionRouter:
+    def __init__(self, models: dict[int, Regression]) -> None:
+        self.__models = dict(models)
+
+    @property
+    def models(self) -> dict[int, Regression]:
+        return self.__models
+
+    @property
+    def R2(self) -> dict[int, float]:
+        return {label: reg.R2 for label, reg in self.__models.items()}
+
+    def __getitem__(self, label: int) -> Regression:
+        return self.__models[label]
+
+    def calc(self, labels: Iterable[int], **kwargs) -> np.ndarray:
+        models = self.__models
+        labels = np.asarray(labels)
+
+        kwargs = {key: np.asarray(arg) for key, arg in kwargs.items()}
+
+        vals = np.full(len(labels), np.nan)
+        for label in np.unique(labels).tolist():
+            if label not in models:
+                raise KeyError("no model is learned for cluster {0}".format(label))
+
+            rows = np.flatnonzero(labels == label)
+            vals[rows] = models[label].calc(**{key: arg[rows] for key, arg in kwargs.items()})
+
+        return vals
+
+    @staticmethod
+    def learn(make: Callable[..., Regression], cl_dfs: dict[int, pd.DataFrame], workers: int = None) -> "RegressionRouter":
+        labels = list(cl_dfs)
+
+        cpus = os.cpu_count() or 1
+        workers = max(1, min(workers or cpus, len(labels)))
+        n_jobs = max(1, cpus // workers)
+
+        if workers == 1:
+            models = [_learn_cluster(make, cl_dfs[label], n_jobs) for label in labels]
+
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                futs = [ex.submit(_learn_cluster, make, cl_dfs[label], n_jobs) for label in labels]
+                models = [fut.result() for fut in futs]
+
+        return RegressionRouter(dict(zip(labels, models)))
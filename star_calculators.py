@@ -5,12 +5,15 @@ from typing import Iterable
 import calculators as calc
 import measures as ms
 import errors as err
+import instrumentation as ins
+import kernels
 
 class StarCalculator:
     def __init__(self, rou: err.Round, ms_type: type) -> None:
         self.__rou = rou
         self.__ms_type = ms_type
 
+    @ins.call
     def calc(self, p_ms: Iterable[ms.Measure]) -> ms.Measure:
         def calc_star_val(p_ms: Iterable[ms.Measure]) -> float:
             val = np.mean(list(map(lambda p: p.val, p_ms)))
@@ -40,4 +43,19 @@ class StarCalculator:
 
         val_ms = ms_type(val_r, err_min_r, err_max_r)
         
-        return val_ms
\ No newline at end of file
+        return val_ms
+
+    def calc_columns(self, codes: np.ndarray, vals: np.ndarray, err_mins: np.ndarray, err_maxs: np.ndarray,
+                     n_stars: int) -> ms.Measure:
+        rou = self.__rou
+        ms_type = self.__ms_type
+
+        val, err_min, err_max = kernels.star_reduce(codes, vals, err_mins, err_maxs, n_stars)
+
+        err_min_r = rou.round_errs(err_min)
+        err_max_r = rou.round_errs(err_max)
+        val_r = rou.round_vals(val, err_min_r)
+
+        val_ms = ms_type(val_r, err_min_r, err_max_r)
+
+        return val_ms
@@ -0,0 +1,217 @@
+import numpy as np
+import pandas as pd
+import calculators as calc
+import errors as err
+import instrumentation as ins
+from conversion import MeasureConverter
+from star_calculators import StarCalculator
+from catalogue import err_min_col, err_max_col
+from typing import Callable, Dict, Iterable
+
+STAR_MEASURE_COLS = [
+    "star_distance",
+    "star_metallicity",
+    "star_mass",
+    "star_radius",
+    "star_teff",
+]
+
+STAR_COLS = [
+    "star_name",
+    "mag_v",
+    "star_sp_type",
+    *[col for name in STAR_MEASURE_COLS for col in (name, err_min_col(name), err_max_col(name))],
+]
+
+CODE_COL = "star_code"
+
+def _first_rows(codes: np.ndarray, valid: np.ndarray, n_stars: int) -> np.ndarray:
+    valid_pos = np.flatnonzero(valid)
+    star_codes, first = np.unique(codes[valid_pos], return_index=True)
+
+    rows = np.full(n_stars, -1)
+    rows[star_codes] = valid_pos[first]
+
+    return rows
+
+def _star_units(star_cols: list[str]) -> list[list[str]]:
+    measure_cols = {col for name in STAR_MEASURE_COLS for col in (name, err_min_col(name), err_max_col(name))}
+
+    units = [[col] for col in star_cols if col not in measure_cols]
+    units += [[col for col in (name, err_min_col(name), err_max_col(name)) if col in star_cols]
+              for name in STAR_MEASURE_COLS if name in star_cols]
+
+    return units
+
+def _star_rows(star_df: pd.DataFrame, codes: np.ndarray, n_stars: int, units: list[list[str]]) -> pd.DataFrame:
+    first_rows = _first_rows(codes, np.ones(len(codes), dtype=bool), n_stars)
+
+    parts = []
+    for unit in units:
+        vals = star_df[unit[0]].to_numpy(dtype=object)
+        valid = pd.notna(vals)
+
+        rows = _first_rows(codes, valid, n_stars)
+        if len(unit) > 1:
+            star_vals = vals[rows][codes]
+            with_errs = valid & (vals == star_vals) & star_df[unit[1:]].notna().all(axis=1).to_numpy()
+
+            err_rows = _first_rows(codes, with_errs, n_stars)
+            rows = np.where(err_rows < 0, rows, err_rows)
+
+        rows = np.where(rows < 0, first_rows, rows)
+
+        parts.append(star_df[unit].iloc[rows].reset_index(drop=True))
+
+    return pd.concat(parts, axis=1)
+
+
+class StarTable:
+    def __init__(self, planets: pd.DataFrame, stars: pd.DataFrame, cols: Iterable[str]) -> None:
+        self.__planets = planets
+        self.__stars = stars
+        self.__cols = list(cols)
+        self.__wide = None
+
+    @staticmethod
+    def split(df: pd.DataFrame, star_cols: Iterable[str] = STAR_COLS) -> "StarTable":
+        star_cols = [col for col in star_cols if col in df]
+        star_df = df[star_cols]
+
+        codes, names = pd.factorize(df["star_name"])
+
+        no_star = codes < 0
+        codes[no_star] = len(names) + np.arange(no_star.sum())
+        n_stars = len(names) + int(no_star.sum())
+
+        units = _star_units(star_cols)
+        stars = _star_rows(star_df, codes, n_stars, units)[star_cols]
+
+        val_cols = [unit[0] for unit in units]
+
+        conflict = np.zeros(len(df), dtype=bool)
+        for col in val_cols:
+            vals = star_df[col].to_numpy(dtype=object)
+            star_vals = stars[col].to_numpy(dtype=object)[codes]
+
+            conflict |= pd.notna(vals) & (vals != star_vals)
+
+        conflict_pos = np.flatnonzero(conflict)
+        if len(conflict_pos):
+            conflict_df = star_df.iloc[conflict_pos]
+            conflict_keys = [conflict_df[col] for col in val_cols]
+
+            variants = conflict_df.groupby(conflict_keys, sort=False, dropna=False, observed=True).ngroup().to_numpy()
+            codes[conflict_pos] = n_stars + variants
+
+            variant_stars = _star_rows(conflict_df, variants, int(variants.max()) + 1, units)[star_cols]
+            stars = pd.concat([stars, variant_stars], ignore_index=True)
+
+        used, codes = np.unique(codes, return_inverse=True)
+        stars = stars.iloc[used].reset_index(drop=True)
+
+        planets = df.drop(columns=star_cols)
+        planets[CODE_COL] = codes
+
+        return StarTable(planets, stars, df.columns)
+
+    @property
+    def planets(self) -> pd.DataFrame:
+        return self.__planets
+
+    @property
+    def stars(self) -> pd.DataFrame:
+        return self.__stars
+
+    @property
+    def conflicts(self) -> pd.DataFrame:
+        stars = self.__stars
+        named = stars["star_name"].notna()
+
+        return stars[named & stars["star_name"].duplicated(keep=False)]
+
+    @property
+    def codes(self) -> np.ndarray:
+        return self.__planets[CODE_COL].to_numpy()
+
+    def column(self, col: str) -> pd.Series:
+        planets = self.__planets
+        if col in planets:
+            return planets[col]
+
+        star_col = self.__stars[col].to_numpy()[self.codes]
+
+        return pd.Series(star_col, index=planets.index, name=col)
+
+    def wide(self) -> pd.DataFrame:
+        if self.__wide is None:
+            planets = self.__planets
+            stars = self.__stars
+
+            star_rows = stars.iloc[self.codes]
+            star_rows.index = planets.index
+
+            wide = pd.concat([planets.drop(columns=CODE_COL), star_rows], axis=1)
+            self.__wide = wide[self.__cols]
+
+        return self.__wide
+
+    def transform_stars(self, steps: Iterable[Callable[[pd.DataFrame], pd.DataFrame]]) -> "StarTable":
+        stars = self.__stars
+        for step in steps:
+            stars = step(stars)
+
+        return StarTable(self.__planets, stars, self.__cols)
+
+    def transform_planets(self, steps: Iterable[Callable[[pd.DataFrame], pd.DataFrame]]) -> "StarTable":
+        planets = self.__planets
+        for step in steps:
+            planets = step(planets)
+
+        return StarTable(planets, self.__stars, self.__cols)
+
+    def aggregate(self, con: MeasureConverter, cal: calc.Calculator, rou: err.Round, star_calc: StarCalculator,
+                  col: str, args: Dict[str, type]) -> "StarTable":
+        planets = self.__planets
+        stars = self.__stars
+
+        need_stars = stars[col].isna().to_numpy()
+
+        codes = self.codes
+        need_pos = np.flatnonzero(need_stars[codes])
+        has_args = planets[list(args)].iloc[need_pos].notna().all(axis=1).to_numpy()
+        calc_pos = need_pos[has_args]
+
+        vals = np.full(len(need_pos), np.nan)
+        err_mins = np.full(len(need_pos), np.nan)
+        err_maxs = np.full(len(need_pos), np.nan)
+
+        kwargs = {arg_col: arg_type(*con.read_arrays(arg_col, planets, calc_pos))
+                  for arg_col, arg_type in args.items()}
+        calc_ms = cal.calc_columns(**kwargs)
+
+        err_r = rou.round_errs(np.broadcast_to(calc_ms.err, calc_pos.shape))
+        vals[has_args] = rou.round_vals(np.broadcast_to(calc_ms.val, calc_pos.shape), err_r)
+        err_mins[has_args] = err_r
+        err_maxs[has_args] = err_r
+
+        star_codes, planet_stars = np.unique(codes[need_pos], return_inverse=True)
+        star_ms = star_calc.calc_columns(planet_stars, vals, err_mins, err_maxs, len(star_codes))
+
+        new_stars = stars.copy()
+        ins.count("copies")
+
+        star_rows = np.zeros(len(stars), dtype=bool)
+        star_rows[star_codes] = True
+
+        col_arrs = con.read_arrays(col, new_stars)
+        for col_arr, star_arr in zip(col_arrs, (star_ms.val, star_ms.err_min, star_ms.err_max)):
+            col_arr[star_codes] = np.where(np.isnan(star_arr), col_arr[star_codes], star_arr)
+
+        new_stars = con.write_arrays(col, *col_arrs, new_stars, star_rows, copy=False)
+
+        computed = int((~np.isnan(star_ms.val)).sum())
+        ins.count("computed", computed)
+        ins.count("passed", len(stars) - computed)
+
+        return StarTable(planets, new_stars, self.__cols)
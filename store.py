@@ -0,0 +1,138 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from typing import Iterable
+
+META_FILE = "meta.json"
+
+def _col_file(path: str, col: str) -> str:
+    return os.path.join(path, "{col}.npy".format(col=col))
+
+
+class CatalogueStore:
+    def __init__(self, path: str, mode="r") -> None:
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+
+        self.__path = path
+        self.__mode = mode
+        self.__rows = meta["rows"]
+        self.__cols = {col["name"]: col for col in meta["columns"]}
+        self.__arrays = {}
+
+    @staticmethod
+    def write(df: pd.DataFrame, path: str) -> "CatalogueStore":
+        os.makedirs(path, exist_ok=True)
+
+        cols = []
+        for col in df.columns:
+            series = df[col]
+
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                cat = series.array
+
+            elif pd.api.types.is_numeric_dtype(series.dtype):
+                arr = series.to_numpy()
+                np.save(_col_file(path, col), arr)
+
+                cols.append({"name": col, "kind": "num", "dtype": arr.dtype.str})
+                continue
+
+            else:
+                cat = pd.Categorical(series)
+
+            np.save(_col_file(path, col), cat.codes)
+
+            categories = cat.categories.tolist()
+            cols.append({"name": col, "kind": "str", "dtype": cat.codes.dtype.str, "categories": categories})
+
+        meta = {"rows": len(df), "columns": cols}
+        with open(os.path.join(path, META_FILE), "w") as f:
+            json.dump(meta, f)
+
+        return CatalogueStore(path)
+
+    @staticmethod
+    def create(path: str, rows: int, dtypes: dict[str, object]) -> "CatalogueStore":
+        os.makedirs(path, exist_ok=True)
+
+        cols = []
+        for col, dtype in dtypes.items():
+            if dtype in ("category", str):
+                codes = np.lib.format.open_memmap(_col_file(path, col), mode="w+", dtype=np.int8, shape=(rows,))
+                codes[:] = -1
+                codes.flush()
+
+                cols.append({"name": col, "kind": "str", "dtype": codes.dtype.str, "categories": []})
+                continue
+
+            arr = np.lib.format.open_memmap(_col_file(path, col), mode="w+", dtype=dtype, shape=(rows,))
+            arr.flush()
+
+            cols.append({"name": col, "kind": "num", "dtype": arr.dtype.str})
+
+        meta = {"rows": rows, "columns": cols}
+        with open(os.path.join(path, META_FILE), "w") as f:
+            json.dump(meta, f)
+
+        return CatalogueStore(path, mode="r+")
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def rows(self) -> int:
+        return self.__rows
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self.__cols.keys())
+
+    def array(self, col: str) -> np.ndarray:
+        arrays = self.__arrays
+
+        if col not in arrays:
+            arrays[col] = np.load(_col_file(self.__path, col), mmap_mode=self.__mode)
+
+        return arrays[col]
+
+    def column(self, col: str, rows: slice = None) -> object:
+        arr = self.array(col)
+        if rows is not None:
+            arr = arr[rows]
+
+        col_meta = self.__cols[col]
+        if col_meta["kind"] == "str":
+            dtype = pd.CategoricalDtype(col_meta["categories"])
+            return pd.Categorical.from_codes(arr, dtype=dtype)
+
+        return arr
+
+    def write_rows(self, start: int, data: dict[str, np.ndarray]) -> None:
+        if self.__mode == "r":
+            raise ValueError("store at \"{path}\" is opened read-only".format(path=self.__path))
+
+        for col, vals in data.items():
+            arr = self.array(col)
+            arr[start:start + len(vals)] = vals
+            arr.flush()
+
+    def frame(self, cols: Iterable[str] = None, rows: slice = None) -> pd.DataFrame:
+        cols = list(cols) if cols is not None else self.columns
+
+        index = pd.RangeIndex(self.__rows)
+        if rows is not None:
+            index = index[rows]
+
+        data = {col: self.column(col, rows) for col in cols}
+        df = pd.DataFrame(data, index=index, copy=False)
+
+        return df
+
+
+def open_frame(path: str, cols: Iterable[str] = None, rows: slice = None) -> pd.DataFrame:
+    store = CatalogueStore(path)
+
+    return store.frame(cols, rows)
@@ -1,11 +1,23 @@
 import measures as ms
+import instrumentation as ins
 import re
 from abc import ABC, abstractmethod
 from collections import namedtuple
 from numpy import arange
 
-_TableValue = namedtuple("TableValue", ["val", "err"], defaults=[0.0, 0.0])
-_Interval = namedtuple("Interval", ["min", "max"], defaults=[0.0, 0.0])
+_TableValue = namedtuple("_TableValue", ["val", "err"], defaults=[0.0, 0.0])
+_Interval = namedtuple("_Interval", ["min", "max"], defaults=[0.0, 0.0])
+
+SP_CLASS_TABLE = {
+    "B": (10000.0, 30000.0),
+    "A": (7400.0, 10000.0),
+    "F": (6000.0, 7400.0),
+    "G": (5000.0, 6000.0),
+    "K": (3800.0, 5000.0),
+    "M": (2500.0, 3800.0),
+    "L": (1300.0, 2500.0),
+    "T": (600.0, 1300.0)
+}
 
 class Table[TTableKey, TValIn](ABC):
     def __init__(self, table: dict[TTableKey, _TableValue], ms_type: type) -> None:
@@ -25,6 +37,7 @@ class Table[TTableKey, TValIn](ABC):
     def _get_table_value(self, val_in: TValIn) -> _TableValue:
         pass
     
+    @ins.call
     def get_ms(self, val_in: TValIn) -> ms.Measure:
         ms_type = self.__ms_type
 
@@ -94,7 +107,6 @@ class SpClassTeffTable(StrTable):
 
                 new_table[key] = _TableValue(val=val, err=err)
 
-        print(new_table)
         return new_table
                 
     def __parse_sp_class(self, sp_class: str) -> __ParsedSpClass:
@@ -0,0 +1,71 @@
+import numpy as np
+from functools import lru_cache
+
+SOL_MASS_KG = 1.989e+30
+JUP_MASS_KG = 1.898e+27
+SOL_RAD_M = 6.957e+8
+JUP_RAD_M = 6.9911e+7
+AU_M = 1.496e+11
+DAY_S = 24 * 60 * 60
+
+JUP_MASS_EARTH = 316.8
+JUP_RAD_EARTH = 11.2
+
+EARTH_MASS_KG = JUP_MASS_KG / JUP_MASS_EARTH
+EARTH_RAD_M = JUP_RAD_M / JUP_RAD_EARTH
+
+UNITS = {
+    "kg": ("mass", 1.0),
+    "sol_mass": ("mass", SOL_MASS_KG),
+    "jup_mass": ("mass", JUP_MASS_KG),
+    "earth_mass": ("mass", EARTH_MASS_KG),
+    "m": ("length", 1.0),
+    "sol_radius": ("length", SOL_RAD_M),
+    "jup_radius": ("length", JUP_RAD_M),
+    "earth_radius": ("length", EARTH_RAD_M),
+    "au": ("length", AU_M),
+    "s": ("time", 1.0),
+    "day": ("time", DAY_S),
+}
+
+def _unit(unit: str) -> tuple[str, float]:
+    try:
+        return UNITS[unit]
+
+    except KeyError:
+        raise ValueError("unknown unit \"{unit}\"".format(unit=unit)) from None
+
+@lru_cache(maxsize=None)
+def factor(from_unit: str, to_unit: str) -> float:
+    from_dim, from_si = _unit(from_unit)
+    to_dim, to_si = _unit(to_unit)
+
+    if from_dim != to_dim:
+        raise ValueError("can't convert {from_unit} ({from_dim}) to {to_unit} ({to_dim})".format(
+            from_unit=from_unit, from_dim=from_dim, to_unit=to_unit, to_dim=to_dim))
+
+    if from_unit == to_unit:
+        return 1.0
+
+    return from_si / to_si
+
+def scale(units: dict[str, float]) -> float:
+    k = 1.0
+    for unit, power in units.items():
+        _, si = _unit(unit)
+        k *= si ** power
+
+    return k
+
+def convert(column, from_unit: str, to_unit: str):
+    return np.multiply(column, factor(from_unit, to_unit))
+
+def to_si(column, unit: str):
+    _, si = _unit(unit)
+
+    return np.multiply(column, si)
+
+def from_si(column, unit: str):
+    _, si = _unit(unit)
+
+    return np.divide(column, si)